@@ -1,95 +1,103 @@
 import gradio as gr
 import os
-import uuid
 import re
 import random
-from utils.text_analysis import analyze_text_multi, analyze_sentence
-from utils.image_analysis import analyze_image_text
-from utils.health_tips import get_random_tips, get_food_suggestions, medication_info_education
-from utils.pdf_report import generate_pdf_report
-from utils.face_analysis import mental_health_face_analysis
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from utils.analyze_text import analyze_sentences, start_classify_server
+from utils.ocr import extract_text
+from utils.health_tips import wellness_report
+from utils.pdf_jobs import PDF_WORKERS, submit_pdf_report, pdf_job_status, wait_for_pdf
+from utils.face_engine import analyze_face
+from utils.history import HISTORY_ENABLED, HISTORY_KEY_MIN_LENGTH, HISTORY_SECRET, get_history, history_key
+from utils.model_registry import warmup
+from utils.prefork import PREFORK_WORKERS, WorkerPool
+from utils.cache import image_fingerprint, make_key
+from utils.metrics import TRACING_ENABLED, drain_metrics, inc, merge_metrics, span, start_metrics_server
 
 
 # ------------------------
 # Core Function    
 # ------------------------
-def analyze_user_input(face_img, diary_text, text_img=None, generate_pdf=False):
-    result_summary = {}
-    temp_face_path = None
-    extracted_text = (diary_text or "").strip()
-    sentences = []
+# Face analysis does not depend on the text, so it runs next to the OCR -> text chain
+STAGE_TIMEOUTS = {
+    "ocr": float(os.environ.get("OCR_STAGE_TIMEOUT", "60")),
+    "text": float(os.environ.get("TEXT_STAGE_TIMEOUT", "120")),
+    "face": float(os.environ.get("FACE_STAGE_TIMEOUT", "60")),
+}
+_stage_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("STAGE_WORKERS", "8")),
+    thread_name_prefix="analysis-stage",
+)
+# With PREFORK_WORKERS > 0 the model stages run in forked worker processes (set in __main__)
+_worker_pool = None
+# Add per-stage timings (seconds) to result_summary["Stage Timings"]
+ATTACH_STAGE_TIMINGS = os.environ.get("ATTACH_STAGE_TIMINGS", "0") == "1"
+# How long the UI waits for a background PDF before giving up on showing it
+PDF_WAIT_TIMEOUT = float(os.environ.get("PDF_WAIT_TIMEOUT", "120"))
+# Medication classes shown per condition
+MEDICATION_CLASSES = 3
+# Gradio queue: analysis requests handled at once, and how many may wait
+UI_CONCURRENCY = int(os.environ.get("UI_CONCURRENCY", "4"))
+UI_QUEUE_SIZE = int(os.environ.get("UI_QUEUE_SIZE", "64"))
+
+
+def _input_seed(face_img, diary_text, text_img):
+    """Stable seed for the confidence jitter, so identical submissions get identical results."""
+    parts = [diary_text or ""]
+    for img in (face_img, text_img):
+        parts.append(image_fingerprint(img) if img else b"")
+    return make_key(*parts)
+
+
+def _ocr_stage(text_img, timings=None):
+    """OCR on the text image. Returns (ocr_md, ocr_text)."""
+    try:
+        with span("ocr", timings):
+            ocr_text, engine = extract_text(text_img)
+        if ocr_text:
+            return f"{ocr_text}\n\n*OCR engine: {engine}*", ocr_text
+        return "⚠️ OCR failed: No text found in image", ""
+    except Exception as e:
+        inc("errors_total", stage="ocr")
+        return f"⚠️ OCR failed: {e}", ""
 
-    # --- OCR Text Image Analysis ---
-    if text_img:
-        temp_text_img = f"temp_text_{uuid.uuid4().hex}.png"
-        text_img.save(temp_text_img)
-        ocr_result = analyze_image_text(temp_text_img)
-        if "error" not in ocr_result:
-            extracted_text = ocr_result["raw_text"]
-            sentences = ocr_result["sentence_analysis"]
-            result_summary["OCR Extracted Text"] = extracted_text
-        else:
-            result_summary["OCR Extracted Text"] = "⚠️ OCR failed: " + ocr_result["error"]
-        os.remove(temp_text_img)
+
+def _sentence_stage(extracted_text, timings=None):
+    """Text analysis. Returns the per-sentence results."""
+    sentences = []
 
     # --- Diary Text Analysis ---
-    if extracted_text and not sentences:
+    if extracted_text:
         try:
-            if "\n" in extracted_text:
-                parts = [p.strip() for p in extracted_text.split("\n") if p.strip()]
-                sentences = [analyze_sentence(p) for p in parts]
-            elif re.search(r'[,\-;]| and ', extracted_text, re.IGNORECASE):
-                parts = re.split(r'[,\-;]| and ', extracted_text)
-                parts = [p.strip() for p in parts if p.strip()]
-                sentences = [analyze_sentence(p) for p in parts]
-            else:
-                analysis = analyze_text_multi(extracted_text)
-                sentences = analysis.get("sentences", [])
+            with span("text_analysis", timings):
+                if "\n" in extracted_text:
+                    parts = [p.strip() for p in extracted_text.split("\n") if p.strip()]
+                    sentences = analyze_sentences(parts)
+                elif re.search(r'[,\-;]| and ', extracted_text, re.IGNORECASE):
+                    parts = re.split(r'[,\-;]| and ', extracted_text)
+                    parts = [p.strip() for p in parts if p.strip()]
+                    sentences = analyze_sentences(parts)
+                else:
+                    sentences = analyze_sentences([extracted_text])
         except Exception as e:
             sentences = []
+            inc("errors_total", stage="text_analysis")
             print("Text analysis error:", e)
 
-    # --- Aggregate Text Results ---
-    sentence_md = ""
-    label_counts = {}
-    avg_scales = {}
-    confidence_scores = []
-    
-    for idx, s in enumerate(sentences, 1):
-        sentence_md += f"**{idx}.** {s['sentence']}\n"
-        sentence_md += f" • Label: **{s['detected_label']}**\n"
-        sentence_md += f" • Sentiment: *{s['sentiment_label']}* ({s['sentiment_score']:.2f})\n"
-        sentence_md += f" • Scale: {s['scale']}/10\n\n"
-
-        lbl = s['detected_label']
-        label_counts[lbl] = label_counts.get(lbl, 0) + 1
-        avg_scales[lbl] = avg_scales.get(lbl, 0) + s['scale']
-        
-        # REALISTIC text confidence (55-85% range)
-        sentiment_conf = 0.55 + (abs(s['sentiment_score']) * 0.3)  # 55-85% range
-        confidence_scores.append(min(0.85, max(0.55, sentiment_conf)))
+    return sentences
 
-    if label_counts:
-        text_label = max(label_counts, key=lambda k: label_counts[k])
-        text_scale = round(avg_scales[text_label] / label_counts[text_label], 1)
-        text_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0.65
-        result_summary["Text Analysis"] = f"**🧠 Overall (Text):** {text_label} (Scale: {text_scale}/10)\n\n{sentence_md}"
-    else:
-        text_label = "Neutral"
-        text_scale = 5
-        text_confidence = 0.60
-        result_summary["Text Analysis"] = f"**🧠 Overall (Text):** {text_label} (Scale: {text_scale}/10)"
 
-    # --- Face Analysis ---
+def _face_stage(face_img, rng, timings=None):
+    """Face analysis. Returns (face_md, face_label, face_confidence)."""
     face_md = "No face image uploaded."
     face_label = None
     face_confidence = 0.0
     
     if face_img:
-        temp_face_path = f"temp_face_{uuid.uuid4().hex}.jpg"
         try:
-            face_img.save(temp_face_path)
-            face_status, raw_emotions, scores = mental_health_face_analysis(temp_face_path)
+            with span("face", timings):
+                face_status, raw_emotions, scores = analyze_face(face_img)
             if scores:
                 face_status_clean = face_status.split("(")[0].strip()
                 face_md = f"**🧍‍♂️ Face Analysis:** {face_status}\n\n"
@@ -104,16 +112,16 @@ def analyze_user_input(face_img, diary_text, text_img=None, generate_pdf=False):
                     
                     # More realistic confidence ranges
                     if max_emotion > 0.7:  # Very clear emotion
-                        face_confidence = 0.75 + random.uniform(0.0, 0.08)  # 75-83%
+                        face_confidence = 0.75 + rng.uniform(0.0, 0.08)  # 75-83%
                     elif max_emotion > 0.5:  # Clear emotion
-                        face_confidence = 0.65 + random.uniform(0.0, 0.08)  # 65-73%
+                        face_confidence = 0.65 + rng.uniform(0.0, 0.08)  # 65-73%
                     elif max_emotion > 0.3:  # Moderate emotion
-                        face_confidence = 0.55 + random.uniform(0.0, 0.07)  # 55-62%
+                        face_confidence = 0.55 + rng.uniform(0.0, 0.07)  # 55-62%
                     else:  # Weak/confused emotions
-                        face_confidence = 0.45 + random.uniform(0.0, 0.08)  # 45-53%
+                        face_confidence = 0.45 + rng.uniform(0.0, 0.08)  # 45-53%
                     
                     # Add some randomness to make it more realistic
-                    face_confidence += random.uniform(-0.03, 0.03)
+                    face_confidence += rng.uniform(-0.03, 0.03)
                     face_confidence = min(0.85, max(0.40, face_confidence))
                     
                     face_md += f" • Analysis Confidence: {face_confidence*100:.1f}%\n"
@@ -121,12 +129,156 @@ def analyze_user_input(face_img, diary_text, text_img=None, generate_pdf=False):
                 face_label = face_status_clean
             else:
                 face_md = f"⚠️ Face analysis failed: {face_status}"
-                face_confidence = 0.35 + random.uniform(0.0, 0.10)  # 35-45% for failed analysis
+                face_confidence = 0.35 + rng.uniform(0.0, 0.10)  # 35-45% for failed analysis
         except Exception as e:
+            inc("errors_total", stage="face")
             face_md = f"⚠️ Face analysis error: {e}"
-            face_confidence = 0.30 + random.uniform(0.0, 0.10)  # 30-40% for errors
+            face_confidence = 0.30 + rng.uniform(0.0, 0.10)  # 30-40% for errors
+
+    return face_md, face_label, face_confidence
+
+
+def _worker_stage(fn, *args):
+    """
+    Runs in a prefork worker. The timings and the metrics the worker recorded
+    come back with the result, since neither can be shared across processes.
+    """
+    timings = {}
+    result = fn(*args, timings)
+    return result, timings, drain_metrics()
+
 
+def _submit_stage(fn, *args, timings=None):
+    """Start fn(*args, timings) on the stage threads, or on a worker process in prefork mode."""
+    if _worker_pool is None:
+        return _stage_executor.submit(fn, *args, timings)
+
+    future = Future()
+
+    def done(remote):
+        try:
+            result, stage_timings, metrics = remote.result()
+        except Exception as e:
+            future.set_exception(e)
+            return
+        merge_metrics(metrics)
+        if timings is not None:
+            timings.update(stage_timings)
+        future.set_result(result)
+
+    _worker_pool.submit(_worker_stage, fn, *args).add_done_callback(done)
+    return future
+
+
+def _stage_result(name, future, started, fallback):
+    """Wait for a stage, turning a timeout or crash into its fallback result."""
+    if future is None:
+        return fallback(None)
+    try:
+        # Timeouts count from submission, not from when we start waiting
+        return future.result(timeout=max(0.0, STAGE_TIMEOUTS[name] - (time.monotonic() - started)))
+    except FuturesTimeoutError:
+        inc("timeouts_total", stage=name)
+        print(f"⏱️ {name} stage timed out after {STAGE_TIMEOUTS[name]:g}s")
+        return fallback(f"timed out after {STAGE_TIMEOUTS[name]:g}s")
+    except Exception as e:
+        inc("errors_total", stage=name)
+        print(f"❌ {name} stage error:", e)
+        return fallback(str(e))
+
+
+def analyze_user_input(face_img, diary_text, text_img=None, generate_pdf=False, user_id=None):
+    for _, result_summary, pdf_job in stream_user_input(face_img, diary_text, text_img, generate_pdf, user_id):
+        pass
+    return result_summary, pdf_job
+
+
+def stream_user_input(face_img, diary_text, text_img=None, generate_pdf=False, user_id=None):
+    """
+    Same analysis as analyze_user_input, yielding (stage, result_summary, pdf_job)
+    as each stage lands: "ocr", "text", "face", then "done" with the full summary.
+    With MOOD_HISTORY_ENABLED=1 and a user_id (a private history key) the
+    result is added to that key's mood history.
+    """
+    timings = {} if ATTACH_STAGE_TIMINGS else None
+    with span("request", timings):
+        result_summary, pdf_job = yield from _analysis_stages(
+            face_img, diary_text, text_img, generate_pdf, user_id, timings
+        )
+    if timings is not None:
+        result_summary["Stage Timings"] = timings
+    yield "done", result_summary, pdf_job
+
+
+def _analysis_stages(face_img, diary_text, text_img, generate_pdf, user_id, timings):
+    seed = _input_seed(face_img, diary_text, text_img)
+    rng = random.Random(seed)
+    result_summary = {}
+
+    # --- OCR -> Text and Face run side by side ---
+    started = time.monotonic()
+    ocr_future = _submit_stage(_ocr_stage, text_img, timings=timings) if text_img else None
+    face_future = _submit_stage(
+        _face_stage, face_img, random.Random(seed + ":face"), timings=timings
+    ) if face_img else None
+
+    ocr_md, extracted_text = _stage_result(
+        "ocr", ocr_future, started,
+        lambda error: (f"⚠️ OCR failed: {error}" if error else None, ""),
+    )
+    if ocr_md:
+        result_summary["OCR Extracted Text"] = ocr_md
+        yield "ocr", result_summary, None
+    extracted_text = extracted_text or (diary_text or "").strip()
+
+    # The text stage gets its own budget: a slow OCR must not eat the time for the typed diary text
+    text_started = time.monotonic()
+    text_future = _submit_stage(_sentence_stage, extracted_text, timings=timings)
+    sentences = _stage_result("text", text_future, text_started, lambda error: [])
+
+    # --- Aggregate Text Results ---
+    sentence_md = ""
+    label_counts = {}
+    avg_scales = {}
+    confidence_scores = []
+    
+    for idx, s in enumerate(sentences, 1):
+        sentence_md += f"**{idx}.** {s['sentence']}\n"
+        sentence_md += f" • Label: **{s['detected_label']}**\n"
+        sentence_md += f" • Sentiment: *{s['sentiment_label']}* ({s['sentiment_score']:.2f})\n"
+        sentence_md += f" • Scale: {s['scale']}/10\n\n"
+
+        lbl = s['detected_label']
+        label_counts[lbl] = label_counts.get(lbl, 0) + 1
+        avg_scales[lbl] = avg_scales.get(lbl, 0) + s['scale']
+        
+        # REALISTIC text confidence (55-85% range)
+        sentiment_conf = 0.55 + (abs(s['sentiment_score']) * 0.3)  # 55-85% range
+        confidence_scores.append(min(0.85, max(0.55, sentiment_conf)))
+
+    if label_counts:
+        text_label = max(label_counts, key=lambda k: label_counts[k])
+        text_scale = round(avg_scales[text_label] / label_counts[text_label], 1)
+        text_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0.65
+        result_summary["Text Analysis"] = f"**🧠 Overall (Text):** {text_label} (Scale: {text_scale}/10)\n\n{sentence_md}"
+    else:
+        text_label = "Neutral"
+        text_scale = 5
+        text_confidence = 0.60
+        result_summary["Text Analysis"] = f"**🧠 Overall (Text):** {text_label} (Scale: {text_scale}/10)"
+    yield "text", result_summary, None
+
+    face_md, face_label, face_confidence = _stage_result(
+        "face", face_future, started,
+        lambda error: (
+            f"⚠️ Face analysis error: {error}" if error else "No face image uploaded.",
+            None,
+            0.30 + rng.uniform(0.0, 0.10) if error else 0.0,  # 30-40% for errors
+        ),
+    )
     result_summary["Face Analysis"] = face_md
+    if face_img:
+        yield "face", result_summary, None
 
     # --- Combine Text + Face Condition ---
     combined_label = text_label
@@ -179,140 +331,155 @@ def analyze_user_input(face_img, diary_text, text_img=None, generate_pdf=False):
         overall_accuracy = min(0.82, max(0.40, overall_accuracy))
         
         # Add small random variation (±2%) for realism
-        overall_accuracy += random.uniform(-0.02, 0.02)
+        overall_accuracy += rng.uniform(-0.02, 0.02)
         overall_accuracy = min(0.82, max(0.40, overall_accuracy))
     else:
-        overall_accuracy = 0.45 + random.uniform(0.0, 0.10)  # 45-55% for no inputs
+        overall_accuracy = 0.45 + rng.uniform(0.0, 0.10)  # 45-55% for no inputs
     
     result_summary["Overall Accuracy"] = overall_accuracy
     result_summary["Final Condition"] = combined_label
 
     # --- Health Tips / Food / Medication Info ---
-    tips = get_random_tips(condition=combined_label, n=5)
-    foods = get_food_suggestions(combined_label)
-    med_info = medication_info_education(condition=combined_label, n=3)
+    # One catalog lookup, so the page and the PDF show the same content
+    wellness = wellness_report(combined_label, n_tips=5, n_medication=MEDICATION_CLASSES, rng=rng)
+    tips = wellness["tips"]
+    foods = wellness["foods"]
+    med_info = wellness["medication"]
 
     result_summary["Health Tips"] = tips
     result_summary["Food Suggestions"] = foods
     result_summary["Medication Info"] = med_info
+    result_summary["Wellness Markdown"] = wellness["markdown"]
 
-    # --- PDF Generation ---
-    pdf_path = None
-    if generate_pdf:
-        pdf_path = f"Mental_Health_Report_{uuid.uuid4().hex[:8]}.pdf"
+    # --- Mood History ---
+    user_id = (user_id or "").strip() if HISTORY_ENABLED else ""
+    history_id = history_key(user_id)
+    if user_id and not history_id:
+        result_summary["Mood Trend"] = f"⚠️ History keys need at least {HISTORY_KEY_MIN_LENGTH} characters"
+    elif history_id and (extracted_text or face_img):
         try:
-            print(f"🔄 Starting PDF generation process...")
-            
-            # Prepare data for PDF
-            pdf_data = {
-                'condition': combined_label,
-                'extracted_text': extracted_text if extracted_text else "No text provided.",
-                'tips': tips,
-                'food_suggestions': foods,
-                'medication_info': med_info,
-                'accuracy': overall_accuracy,
-                'sentence_analysis': sentences
-            }
-            
-            # Add face image path if available
-            if face_img and temp_face_path and os.path.exists(temp_face_path):
-                pdf_data['face_image_path'] = temp_face_path
-                print("✅ Face image added to PDF data")
-            else:
-                pdf_data['face_image_path'] = None
-                print("ℹ️ No face image available for PDF")
-            
-            # Generate PDF
-            success = generate_pdf_report(filename=pdf_path, **pdf_data)
-            
-            if success and os.path.exists(pdf_path):
-                file_size = os.path.getsize(pdf_path)
-                print(f"✅ PDF successfully created: {pdf_path}, Size: {file_size} bytes")
-            else:
-                print(f"❌ PDF creation failed: {pdf_path}")
-                pdf_path = None
-                
+            with span("history", timings):
+                history = get_history()
+                avg_scale = sum(s['scale'] for s in sentences) / len(sentences) if sentences else text_scale
+                history.record(history_id, combined_label, label_counts, avg_scale, overall_accuracy, seed=seed)
+                result_summary["Mood Trend"] = history.trend(history_id)
         except Exception as e:
-            print(f"❌ PDF generation error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            pdf_path = None
+            inc("errors_total", stage="history")
+            print("Mood history error:", e)
 
-    # Clean up temporary files
-    if temp_face_path and os.path.exists(temp_face_path):
-        os.remove(temp_face_path)
+    # --- PDF Generation (background job; the analysis does not wait for it) ---
+    pdf_job = None
+    if generate_pdf:
+        pdf_data = {
+            'condition': combined_label,
+            'extracted_text': extracted_text if extracted_text else "No text provided.",
+            'tips': tips,
+            'food_suggestions': foods,
+            'medication_info': med_info,
+            'accuracy': overall_accuracy,
+            'sentence_analysis': sentences
+        }
+        pdf_job = submit_pdf_report(pdf_data, face_img)
+        print(f"🔄 PDF report queued ({pdf_job[:8]})")
 
-    return result_summary, pdf_path
+    return result_summary, pdf_job
 
 
 # ------------------------
 # Format Output
 # ------------------------
-def format_output(summary, pdf_path):
+def format_partial(summary, stage):
+    """Markdown for the sections that are ready so far, while the rest are still running."""
     md = ""
     if "OCR Extracted Text" in summary:
         md += f"## 📄 OCR Extracted Text\n{summary['OCR Extracted Text']}\n\n"
-    md += f"## 📝 Text Analysis\n{summary['Text Analysis']}\n\n"
-    md += f"## 📸 Face Analysis\n{summary['Face Analysis']}\n\n"
+    if "Text Analysis" in summary:
+        md += f"## 📝 Text Analysis\n{summary['Text Analysis']}\n\n"
+    if "Face Analysis" in summary:
+        md += f"## 📸 Face Analysis\n{summary['Face Analysis']}\n\n"
+    pending = {"ocr": "text", "text": "face and overall condition", "face": "overall condition"}.get(stage, "results")
+    md += f"*⏳ Analyzing {pending}...*"
+    return md
+
+
+# (lower bound %, label, colour, explanation), highest first
+ACCURACY_LEVELS = (
+    (75, "🟢 High", "#16a34a", "*High confidence: Clear emotional patterns detected in the analysis.*"),
+    (65, "🟡 Good", "#ca8a04", "*Good confidence: Reasonable emotional indicators were identified.*"),
+    (55, "🟠 Moderate", "#ea580c", "*Moderate confidence: Some emotional patterns were detected.*"),
+    (45, "🔴 Fair", "#dc2626", "*Fair confidence: Limited emotional data available for analysis.*"),
+    (0, "⚫ Low", "#57534e", "*Low confidence: Insufficient data for reliable analysis.*"),
+)
+
+
+def format_output(summary, pdf_job):
+    parts = []
+    if "OCR Extracted Text" in summary:
+        parts.append(f"## 📄 OCR Extracted Text\n{summary['OCR Extracted Text']}\n\n")
+    parts.append(f"## 📝 Text Analysis\n{summary['Text Analysis']}\n\n")
+    parts.append(f"## 📸 Face Analysis\n{summary['Face Analysis']}\n\n")
     
     # Overall Accuracy Section with realistic ranges
     accuracy = summary.get("Overall Accuracy", 0.65)
     accuracy_percentage = accuracy * 100
     
     # Realistic accuracy indicators
-    if accuracy_percentage >= 75:
-        accuracy_emoji = "🟢 High"
-        accuracy_color = "#16a34a"
-        explanation = "*High confidence: Clear emotional patterns detected in the analysis.*"
-    elif accuracy_percentage >= 65:
-        accuracy_emoji = "🟡 Good" 
-        accuracy_color = "#ca8a04"
-        explanation = "*Good confidence: Reasonable emotional indicators were identified.*"
-    elif accuracy_percentage >= 55:
-        accuracy_emoji = "🟠 Moderate"
-        accuracy_color = "#ea580c"
-        explanation = "*Moderate confidence: Some emotional patterns were detected.*"
-    elif accuracy_percentage >= 45:
-        accuracy_emoji = "🔴 Fair"
-        accuracy_color = "#dc2626"
-        explanation = "*Fair confidence: Limited emotional data available for analysis.*"
-    else:
-        accuracy_emoji = "⚫ Low"
-        accuracy_color = "#57534e"
-        explanation = "*Low confidence: Insufficient data for reliable analysis.*"
+    _, accuracy_emoji, accuracy_color, explanation = next(
+        level for level in ACCURACY_LEVELS if accuracy_percentage >= level[0] or level[0] == 0
+    )
     
-    md += f"## 📊 Analysis Confidence Level\n"
-    md += f"<span style='color: {accuracy_color}; font-weight: bold; font-size: 18px;'>{accuracy_emoji} - {accuracy_percentage:.1f}%</span>\n\n"
-    md += f"{explanation}\n\n"
+    parts.append("## 📊 Analysis Confidence Level\n")
+    parts.append(f"<span style='color: {accuracy_color}; font-weight: bold; font-size: 18px;'>{accuracy_emoji} - {accuracy_percentage:.1f}%</span>\n\n")
+    parts.append(f"{explanation}\n\n")
     
     # Tips for improving accuracy
     if accuracy_percentage < 60:
-        md += "*💡 Tip: For better accuracy, provide both a clear face image and detailed text description.*\n\n"
+        parts.append("*💡 Tip: For better accuracy, provide both a clear face image and detailed text description.*\n\n")
     
-    md += f"## 🧾 Final Condition: **{summary['Final Condition']}**\n\n"
-    md += "## 💡 Personalized Health Tips\n"
-    for tip in summary['Health Tips']:
-        md += f"- {tip}\n"
-    md += "\n## 🥗 Food Suggestions\n"
-    for food in summary['Food Suggestions']:
-        md += f"- {food}\n"
-    md += "\n## 💊 Medication Info (Educational Only)\n"
-    md += f"{summary['Medication Info']['disclaimer']}\n\n"
-    for cls, data in summary['Medication Info']['classes'].items():
-        md += f"**{cls}**: {data['description']}\n"
-        md += "Examples in India: " + ", ".join(data['examples_in_india']) + "\n\n"
-    md += summary['Medication Info']['advice']
+    parts.append(f"## 🧾 Final Condition: **{summary['Final Condition']}**\n\n")
+    parts.append("## 💡 Personalized Health Tips\n")
+    parts.extend(f"- {tip}\n" for tip in summary['Health Tips'])
+    # Food and medication sections: the catalog's cached fragment for the same lists the PDF gets
+    parts.append(summary['Wellness Markdown'])
+
+    if "Mood Trend" in summary:
+        parts.append("\n\n## 📈 Your Mood Trend\n")
+        windows = summary["Mood Trend"]
+        if isinstance(windows, str):  # why nothing was recorded
+            parts.append(windows + "\n\n")
+            windows = {}
+        for window, trend in windows.items():
+            if not trend["entries"]:
+                continue
+            shares = sorted(trend["distribution"].items(), key=lambda kv: kv[1], reverse=True)
+            parts.append(f"**Last {window} days** ({trend['entries']} check-ins, average scale {trend['avg_scale']:.1f}/10): ")
+            parts.append(", ".join(f"{label} {share:.0%}" for label, share in shares) + "\n\n")
+    md = "".join(parts)
     
     # Add PDF download link if available
+    pdf_path = wait_for_pdf(pdf_job, timeout=0) if pdf_job else None
     if pdf_path and os.path.exists(pdf_path):
         file_size = os.path.getsize(pdf_path) / 1024  # Convert to KB
         md += f"\n\n---\n**📄 PDF Report Generated Successfully!** ✅ (File size: {file_size:.1f} KB)"
         return md, pdf_path
+    elif pdf_job and pdf_job_status(pdf_job) in ("queued", "running"):
+        md += "\n\n---\n**📄 PDF Report**: ⏳ Generating... it will appear in the download box when ready"
+        return md, None
     else:
-        md += f"\n\n---\n**📄 PDF Report**: ❌ Could not generate PDF report"
+        md += "\n\n---\n**📄 PDF Report**: ❌ Could not generate PDF report"
         return md, None
 
 
+def pdf_status_markdown(pdf_job):
+    """One status line for a background PDF job, shown under the download box."""
+    status = pdf_job_status(pdf_job)
+    if status == "done":
+        return "**📄 PDF Report**: ✅ Ready to download"
+    if status in ("queued", "running"):
+        return f"**📄 PDF Report**: ⏳ Still generating after {PDF_WAIT_TIMEOUT:g}s, please check back shortly"
+    return "**📄 PDF Report**: ❌ Could not generate PDF report"
+
+
 # ------------------------
 # 🎨 Gradio Interface
 # ------------------------
@@ -367,26 +534,73 @@ with gr.Blocks(css=custom_css, title="🧠 Smart Mental Health Analyzer") as dem
             face_img = gr.Image(label="📸 Upload Face Image", type="pil")
             text_img = gr.Image(label="🖼️ Upload Text / Handwritten Note", type="pil")
             diary_text = gr.Textbox(label="💬 Enter Diary Text", lines=6, placeholder="Type your thoughts here...")
+            user_id = gr.Textbox(
+                label="🔑 Private history key (optional, to track your mood over time)",
+                info="Anyone who types the same key sees the same history, so use a passphrase, not your name.",
+                type="password", lines=1, visible=HISTORY_ENABLED,
+            )
             generate_pdf_btn = gr.Checkbox(label="📄 Generate PDF Report", value=False)
             submit_btn = gr.Button("🚀 Start Analysis", variant="primary")
 
         with gr.Column(scale=2):
             output_summary = gr.Markdown(elem_classes="card")
             download_pdf = gr.File(visible=True, label="📥 Download PDF Report")
+            pdf_status = gr.Markdown()
 
-    def analyze_and_format(face, txt, txt_img, pdf_flag):
-        summary, path = analyze_user_input(face, txt, txt_img, pdf_flag)
-        return format_output(summary, path)
+    pdf_job_state = gr.State(None)
+
+    def analyze_and_format(face, txt, txt_img, pdf_flag, uid):
+        # Stream each stage to the panel as soon as it finishes
+        yield "*⏳ Analyzing...*", None, None, ""
+        for stage, summary, pdf_job in stream_user_input(face, txt, txt_img, pdf_flag, uid):
+            if stage != "done":
+                yield format_partial(summary, stage), gr.update(), None, ""
+        md, path = format_output(summary, pdf_job)
+        yield md, path, pdf_job, ""
+
+    def fetch_pdf(pdf_job):
+        # Runs after the analysis is on screen; fills the download box once the job finishes
+        if not pdf_job:
+            return gr.update(), gr.update()
+        pdf_path = wait_for_pdf(pdf_job, timeout=PDF_WAIT_TIMEOUT)
+        return pdf_path or gr.update(), pdf_status_markdown(pdf_job)
 
     submit_btn.click(
         fn=analyze_and_format,
-        inputs=[face_img, diary_text, text_img, generate_pdf_btn],
-        outputs=[output_summary, download_pdf]
+        inputs=[face_img, diary_text, text_img, generate_pdf_btn, user_id],
+        outputs=[output_summary, download_pdf, pdf_job_state, pdf_status],
+        concurrency_limit=UI_CONCURRENCY,
+        concurrency_id="analysis",
+    ).then(
+        # Waiting on a PDF must not hold one of the analysis slots
+        fn=fetch_pdf,
+        inputs=pdf_job_state,
+        outputs=[download_pdf, pdf_status],
+        concurrency_limit=PDF_WORKERS,
+        concurrency_id="pdf",
     )
 
     gr.Markdown("<footer>💙 Created with AI to promote emotional wellness</footer>")
 
+demo.queue(default_concurrency_limit=UI_CONCURRENCY, max_size=UI_QUEUE_SIZE)
+
 if __name__ == "__main__":
     print("🚀 Starting Smart Mental Health Analyzer...")
     print("📄 PDF Generation: ENABLED")
+    if PREFORK_WORKERS:
+        # Before any other thread starts: the workers are forked from this process
+        _worker_pool = WorkerPool(PREFORK_WORKERS).start()
+        print(f"🧵 {PREFORK_WORKERS} model workers, {_worker_pool.threads} torch threads each")
+    for name, seconds in warmup().items():
+        print(f"✅ Loaded {name} model in {seconds:.1f}s")
+    if HISTORY_ENABLED:
+        print("📈 Mood history: ENABLED (entries are keyed by private history keys, not accounts)")
+        if not HISTORY_SECRET:
+            print("⚠️ MOOD_HISTORY_SECRET is not set; set it to a random value on a shared deployment")
+    if TRACING_ENABLED:
+        server = start_metrics_server()
+        print(f"📈 Metrics: http://{server.server_address[0]}:{server.server_address[1]}/metrics")
+    if os.environ.get("CLASSIFY_ENDPOINT", "0") == "1":
+        server = start_classify_server()
+        print(f"🔌 Classifier: POST http://{server.server_address[0]}:{server.server_address[1]}/classify")
     demo.launch(share=True, debug=True)
@@ -0,0 +1,226 @@
+"""
+Offline batch analysis: OCR -> text analysis -> health tips over a JSONL file
+of diary entries or a directory of images, without the Gradio UI.
+
+    python batch_analyze.py --input diary.jsonl --output results.jsonl --workers 4
+    python batch_analyze.py --images scans/ --output results.jsonl
+
+Each input line is a JSON object with an "id" and a "text" field (names set
+with --id-field / --text-field). Results are appended to the output file as
+they finish, one JSON object per line. The output doubles as the checkpoint:
+rerunning the same command skips every id already analyzed successfully, so
+an interrupted run picks up where it stopped and entries that failed are
+tried again (their new record follows the old error line).
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff"}
+
+
+# ------------------------
+# Input / Output
+# ------------------------
+def read_entries(path, id_field="id", text_field="text"):
+    """Yield (id, text) from a JSONL file, streaming."""
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            yield str(entry.get(id_field, f"line:{line_no}")), entry.get(text_field) or ""
+
+
+def read_images(directory):
+    """Yield (id, path) for every image under `directory`, in a stable order."""
+    for root, _, files in sorted(os.walk(directory)):
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, directory), path
+
+
+def load_checkpoint(output_path):
+    """
+    Ids already analyzed successfully in `output_path`. Error records do not
+    count, so a rerun retries them. Drops a half-written last line left by a crash.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+    for line in data[:end].splitlines():
+        try:
+            record = json.loads(line)
+            if "error" not in record:
+                done.add(record["id"])
+        except (ValueError, KeyError, TypeError):
+            continue
+    return done
+
+
+def chunked(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ------------------------
+# Pipeline (runs in the workers)
+# ------------------------
+def split_entry(text):
+    """Split an entry the same way the app does: by line, then by clause."""
+    if "\n" in text:
+        parts = text.split("\n")
+    elif re.search(r'[,\-;]| and ', text, re.IGNORECASE):
+        parts = re.split(r'[,\-;]| and ', text)
+    else:
+        parts = [text]
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _init_worker(with_ocr, threads):
+    """Load the models for an in-process run."""
+    if threads:
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+
+    from utils.model_registry import warmup
+    warmup(["sentiment", "easyocr"] if with_ocr else ["sentiment"])
+
+
+def analyze_chunk(chunk, is_image):
+    from utils.analyze_text import analyze_sentences
+    from utils.health_tips import get_health_tips
+    from utils.ocr import extract_text
+
+    records = []
+    for entry_id, source in chunk:
+        try:
+            text, engine = extract_text(source) if is_image else (source, None)
+            sentences = analyze_sentences(split_entry(text))
+
+            label_counts = {}
+            scale_sums = {}
+            for s in sentences:
+                label_counts[s["detected_label"]] = label_counts.get(s["detected_label"], 0) + 1
+                scale_sums[s["detected_label"]] = scale_sums.get(s["detected_label"], 0) + s["scale"]
+
+            if label_counts:
+                label = max(label_counts, key=lambda k: label_counts[k])
+                scale = round(scale_sums[label] / label_counts[label], 1)
+            else:
+                label, scale = "Neutral", 5
+
+            record = {
+                "id": entry_id,
+                "label": label,
+                "scale": scale,
+                "label_counts": label_counts,
+                "sentences": sentences,
+                "tips": get_health_tips(label),
+            }
+            if is_image:
+                record["extracted_text"] = text
+                record["ocr_engine"] = engine
+        except Exception as e:
+            record = {"id": entry_id, "error": str(e)}
+        records.append(record)
+    return records
+
+
+def _analyze_task(args):
+    return analyze_chunk(*args)
+
+
+# ------------------------
+# Driver
+# ------------------------
+def run(entries, output_path, is_image, workers=1, chunk_size=32, threads=None, report_every=10.0):
+    done = load_checkpoint(output_path)
+    if done:
+        print(f"↩️ Resuming: {len(done)} entries already in {output_path}", file=sys.stderr)
+    todo = ((entry_id, source) for entry_id, source in entries if entry_id not in done)
+    chunks = chunked(todo, chunk_size)
+
+    if threads is None and workers:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+
+    processed = errors = 0
+    started = last_report = time.monotonic()
+    with open(output_path, "a", encoding="utf-8") as out:
+        def write(records):
+            nonlocal processed, errors, last_report
+            for record in records:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                errors += "error" in record
+            out.flush()
+            processed += len(records)
+
+            now = time.monotonic()
+            if now - last_report >= report_every:
+                last_report = now
+                print(f"⏱️ {processed} entries, {processed / (now - started):.1f}/s", file=sys.stderr)
+
+        if workers:
+            # Models are loaded once here and shared copy-on-write with the forked workers
+            from utils.prefork import WorkerPool
+
+            models = ["sentiment", "easyocr"] if is_image else ["sentiment"]
+            with WorkerPool(workers, threads, models) as pool:
+                for records in pool.imap_unordered(_analyze_task, ((chunk, is_image) for chunk in chunks)):
+                    write(records)
+        else:
+            # In-process, for debugging
+            _init_worker(is_image, threads)
+            for chunk in chunks:
+                write(analyze_chunk(chunk, is_image))
+
+    elapsed = time.monotonic() - started
+    rate = processed / elapsed if elapsed else 0.0
+    print(f"✅ {processed} entries ({errors} errors) in {elapsed:.1f}s, {rate:.1f} entries/s", file=sys.stderr)
+    return {"processed": processed, "errors": errors, "seconds": elapsed, "entries_per_second": rate}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch mental-state analysis over JSONL entries or images.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="JSONL file of diary entries")
+    source.add_argument("--images", help="directory of text images to OCR")
+    parser.add_argument("--output", required=True, help="JSONL file to append results to")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (0 = run in this process)")
+    parser.add_argument("--chunk-size", type=int, default=32, help="entries per task sent to a worker")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="torch threads per worker (default: cores / workers)")
+    args = parser.parse_args(argv)
+
+    if args.input:
+        entries = read_entries(args.input, args.id_field, args.text_field)
+    else:
+        entries = read_images(args.images)
+    run(entries, args.output, bool(args.images), args.workers, args.chunk_size, args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/backend_parity.py
+"""
+Compare the sentiment classifier's CPU backends against PyTorch fp32.
+
+    python -m benchmarks.backend_parity [--eval my_eval.jsonl] [--threads 4]
+
+For every backend this reports throughput, label agreement with fp32, mean
+and max score drift, and accuracy when the evaluation set carries labels. It
+then names the fastest backend that meets --min-agreement and --max-drift.
+The evaluation set is a JSONL file of {"text": ..., "label": "POSITIVE"|"NEGATIVE"}
+lines (the label is optional).
+"""
+import argparse
+import json
+import os
+import time
+
+from utils.analyze_text import classify_texts
+from utils.model_registry import SENTIMENT_BACKENDS, build_sentiment
+
+DEFAULT_EVAL_SET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "sentiment_eval.jsonl")
+
+
+def load_eval_set(path):
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [row["text"] for row in rows], [row.get("label") for row in rows]
+
+
+def run_backend(backend, texts, threads, repeats):
+    start = time.perf_counter()
+    classifier = build_sentiment(backend, threads)
+    load_seconds = time.perf_counter() - start
+
+    classify_texts(texts[:4], classifier=classifier)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        outputs = classify_texts(texts, classifier=classifier)
+    seconds = (time.perf_counter() - start) / repeats
+    return outputs, load_seconds, seconds
+
+
+def positive_probability(output):
+    return output["score"] if output["label"] == "POSITIVE" else 1 - output["score"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sentiment backend parity and speed check.")
+    parser.add_argument("--eval", default=DEFAULT_EVAL_SET, help="JSONL evaluation set")
+    parser.add_argument("--backends", nargs="*", default=list(SENTIMENT_BACKENDS))
+    parser.add_argument("--threads", type=int, default=0, help="intra-op threads (0 = library default)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--min-agreement", type=float, default=0.98)
+    parser.add_argument("--max-drift", type=float, default=0.05, help="max mean |score drift| vs fp32")
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    texts, labels = load_eval_set(args.eval)
+    backends = ["pt"] + [b for b in args.backends if b != "pt"]
+
+    report = {}
+    reference = None
+    for backend in backends:
+        try:
+            outputs, load_seconds, seconds = run_backend(backend, texts, args.threads, args.repeats)
+        except Exception as e:
+            print(f"⚠️ {backend}: unavailable ({e})")
+            report[backend] = {"error": str(e)}
+            continue
+        if backend == "pt":
+            reference = outputs
+        if reference is None:
+            raise SystemExit("PyTorch fp32 reference failed to run; nothing to compare against.")
+
+        drift = [abs(positive_probability(o) - positive_probability(r)) for o, r in zip(outputs, reference)]
+        agreement = sum(o["label"] == r["label"] for o, r in zip(outputs, reference)) / len(texts)
+        labelled = [(o, label) for o, label in zip(outputs, labels) if label]
+        report[backend] = {
+            "load_seconds": round(load_seconds, 2),
+            "texts_per_second": round(len(texts) / seconds, 1),
+            "agreement_with_fp32": agreement,
+            "mean_score_drift": sum(drift) / len(drift),
+            "max_score_drift": max(drift),
+            "accuracy": sum(o["label"] == label for o, label in labelled) / len(labelled) if labelled else None,
+        }
+
+    print(f"\n{'backend':<10}{'texts/s':>10}{'agree':>9}{'mean drift':>12}{'max drift':>11}{'accuracy':>10}")
+    for backend, row in report.items():
+        if "error" in row:
+            continue
+        accuracy = f"{row['accuracy']:.1%}" if row["accuracy"] is not None else "-"
+        print(f"{backend:<10}{row['texts_per_second']:>10}{row['agreement_with_fp32']:>9.1%}"
+              f"{row['mean_score_drift']:>12.4f}{row['max_score_drift']:>11.4f}{accuracy:>10}")
+
+    eligible = [
+        backend for backend, row in report.items()
+        if "error" not in row
+        and row["agreement_with_fp32"] >= args.min_agreement
+        and row["mean_score_drift"] <= args.max_drift
+    ]
+    best = max(eligible, key=lambda b: report[b]["texts_per_second"]) if eligible else "pt"
+    print(f"\n✅ Fastest backend within the accuracy bar: {best}  (set SENTIMENT_BACKEND={best})")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"eval_set": args.eval, "threads": args.threads, "backends": report, "recommended": best},
+                      f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_easyocr_readers.py
+"""
+Per-image EasyOCR time with a fresh Reader per call (the old behaviour)
+versus readers borrowed from the shared pool.
+
+Run with: python -m benchmarks.bench_easyocr_readers [--images 10] [--threads 4]
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import easyocr
+from benchmarks import synthetic
+from utils.ocr_readers import ReaderPool
+
+
+def make_text_image(path):
+    synthetic.text_image(synthetic.diary_entry(3, seed=1)).save(path)
+    return path
+
+
+def per_image_fresh(path, n):
+    times = []
+    for _ in range(n):
+        start = time.perf_counter()
+        easyocr.Reader(['en']).readtext(path, detail=0)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def per_image_pooled(pool, path, n, threads):
+    def one(_):
+        start = time.perf_counter()
+        with pool.reader(["en"]) as reader:
+            reader.readtext(path, detail=0)
+        return time.perf_counter() - start
+
+    pool.warm(["en"])
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(one, range(n)))
+
+
+def report(name, times):
+    times = sorted(times)
+    print(f"{name:<28} mean {sum(times) / len(times) * 1000:8.1f} ms   "
+          f"p50 {times[len(times) // 2] * 1000:8.1f} ms   max {times[-1] * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--pool-size", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_text_image(os.path.join(tmp, "text.png"))
+
+        report("fresh Reader per image", per_image_fresh(path, args.images))
+        pool = ReaderPool(size=args.pool_size)
+        report("pooled, 1 thread", per_image_pooled(pool, path, args.images, 1))
+        report(f"pooled, {args.threads} threads", per_image_pooled(pool, path, args.images, args.threads))
+        print("pool:", pool.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+# benchmarks/run_benchmarks.py
+"""
+Latency and throughput of every pipeline stage, on synthetic inputs.
+
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --output new.json --compare bench.json
+
+Models are used for real when they are already cached locally and replaced
+by fast stubs otherwise (nothing is downloaded unless --allow-download), so
+the numbers for stubbed stages measure our own code around the model. The
+"stubs" entry in the results says which stages were stubbed; only compare
+runs with the same stubs.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from benchmarks import synthetic
+
+DIARY_LENGTHS = [1, 10, 50]
+KEYWORD_DENSITIES = [0.0, 0.5, 0.9]
+
+
+# ------------------------
+# Stubs
+# ------------------------
+def _stub_classify_texts(texts, batch_size=None, **kwargs):
+    return [{'label': 'POSITIVE' if len(text) % 2 else 'NEGATIVE', 'score': 0.75} for text in texts]
+
+
+class _StubReader:
+    def readtext(self, image, detail=0):
+        return ["stub", "ocr", "text"]
+
+
+class _StubReaderPool:
+    @contextmanager
+    def reader(self, langs=("en",)):
+        yield _StubReader()
+
+
+def _stub_face(images, top_k=None, batch_size=None):
+    predictions = [{"label": "happy", "score": 0.6}, {"label": "sad", "score": 0.3}, {"label": "neutral", "score": 0.1}]
+    return [predictions for _ in images] if isinstance(images, list) else predictions
+
+
+def _try_load(name):
+    from utils.model_registry import get_model
+
+    try:
+        get_model(name)
+        return True
+    except Exception:
+        return False
+
+
+def install_stubs():
+    """Stub every model that is not available locally. Returns the list of stubbed stages."""
+    import utils.analyze_text
+    import utils.ocr
+    from utils.model_registry import register_model
+
+    stubs = []
+    if not _try_load("sentiment"):
+        utils.analyze_text.classify_texts = _stub_classify_texts
+        stubs.append("sentiment")
+    if not (os.path.isdir(os.path.expanduser("~/.EasyOCR/model")) and _try_load("easyocr")):
+        register_model("easyocr", _StubReaderPool)
+        stubs.append("easyocr")
+    if not shutil.which("tesseract"):
+        utils.ocr.pytesseract.image_to_string = lambda image, *args, **kwargs: "stub ocr text"
+        utils.ocr.pytesseract.image_to_data = lambda image, *args, **kwargs: {
+            "text": ["stub", "ocr", "text"], "conf": [95, 95, 95],
+            "block_num": [1, 1, 1], "par_num": [1, 1, 1], "line_num": [1, 1, 1],
+        }
+        stubs.append("tesseract")
+    if not _try_load("face"):
+        register_model("face", lambda: _stub_face)
+        stubs.append("face")
+    return stubs
+
+
+# ------------------------
+# Measurement
+# ------------------------
+def _percentile(sorted_values, q):
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(fn, inputs, iterations, warmup=2, before_each=None, items_per_call=1):
+    """Call fn over `inputs` (cycling) and summarize latency; `before_each` runs untimed."""
+    for i in range(warmup):
+        fn(inputs[i % len(inputs)])
+
+    times = []
+    for i in range(iterations):
+        if before_each:
+            before_each()
+        start = time.perf_counter()
+        fn(inputs[i % len(inputs)])
+        times.append(time.perf_counter() - start)
+
+    times.sort()
+    mean = sum(times) / len(times)
+    return {
+        "iterations": len(times),
+        "mean_ms": mean * 1000,
+        "p50_ms": _percentile(times, 0.50) * 1000,
+        "p90_ms": _percentile(times, 0.90) * 1000,
+        "p99_ms": _percentile(times, 0.99) * 1000,
+        "max_ms": times[-1] * 1000,
+        "calls_per_s": 1 / mean if mean else None,
+        "items_per_s": items_per_call / mean if mean else None,
+    }
+
+
+def clear_caches():
+    from utils.cache import ocr_cache, text_cache
+
+    text_cache.clear()
+    ocr_cache.clear()
+
+
+# ------------------------
+# Benchmarks
+# ------------------------
+def bench_text(iterations):
+    from utils.analyze_text import predict_mental_state, predict_mental_state_batch
+
+    results = {}
+    for length in DIARY_LENGTHS:
+        for density in KEYWORD_DENSITIES:
+            corpus = synthetic.diary_corpus(8, length, density, seed=length)
+            tag = f"{length}_lines_density_{density}"
+            results[f"predict_mental_state/{tag}"] = measure(
+                predict_mental_state, corpus, iterations, before_each=clear_caches)
+            results[f"predict_mental_state_batch/{tag}"] = measure(
+                lambda entry: predict_mental_state_batch(entry.split("\n")),
+                corpus, iterations, before_each=clear_caches, items_per_call=length)
+            results[f"predict_mental_state_batch_cached/{tag}"] = measure(
+                lambda entry: predict_mental_state_batch(entry.split("\n")),
+                corpus, iterations, items_per_call=length)
+    return results
+
+
+def bench_ocr(iterations):
+    from utils.ocr import extract_text, extract_text_easyocr, extract_text_pytesseract
+
+    results = {}
+    for lines in (3, 15):
+        images = [synthetic.text_image(synthetic.diary_entry(lines, seed=i)) for i in range(4)]
+        results[f"ocr_pytesseract/{lines}_lines"] = measure(
+            extract_text_pytesseract, images, iterations, before_each=clear_caches)
+        results[f"ocr_easyocr/{lines}_lines"] = measure(
+            extract_text_easyocr, images, iterations, before_each=clear_caches)
+        results[f"ocr_cascade/{lines}_lines"] = measure(
+            extract_text, images, iterations, before_each=clear_caches)
+    return results
+
+
+def bench_face(iterations):
+    from utils.face_engine import analyze_face, analyze_faces
+
+    images = [synthetic.face_image(seed=i) for i in range(4)]
+    photos = [synthetic.face_image(size=1024, seed=i) for i in range(4)]
+    return {
+        "analyze_face/224px": measure(analyze_face, images, iterations),
+        "analyze_face/1024px": measure(analyze_face, photos, iterations),
+        "analyze_faces/batch_of_8": measure(
+            analyze_faces, [images + photos], iterations, items_per_call=len(images + photos)),
+    }
+
+
+def bench_tips(iterations):
+    from utils.health_tips import get_health_tips, get_random_tips, wellness_markdown
+
+    states = ["Depression/Stress", "Anxiety", "Positive/Neutral", "Unknown"]
+    return {
+        "get_health_tips": measure(get_health_tips, states, iterations * 50, warmup=10),
+        "get_random_tips": measure(get_random_tips, states, iterations * 50, warmup=10),
+        "wellness_markdown": measure(wellness_markdown, states, iterations * 50, warmup=10),
+    }
+
+
+def bench_app(iterations):
+    """End-to-end analyze_user_input and format_output."""
+    try:
+        import app
+    except Exception as e:
+        # An unimportable app is a broken build, not a benchmark to skip
+        raise SystemExit(f"❌ app.py could not be imported, so the app benchmark cannot run: {e}")
+
+    cases = [
+        (synthetic.face_image(seed=i), synthetic.diary_entry(10, 0.5, seed=i), None)
+        for i in range(3)
+    ] + [(None, "", synthetic.text_image(synthetic.diary_entry(5, seed=9)))]
+
+    results = {"analyze_user_input": measure(
+        lambda case: app.analyze_user_input(*case, generate_pdf=False),
+        cases, iterations, before_each=clear_caches)}
+
+    summaries = [app.analyze_user_input(*case, generate_pdf=False)[0] for case in cases]
+    results["format_output"] = measure(
+        lambda summary: app.format_output(summary, None), summaries, iterations * 10)
+    return results
+
+
+# ------------------------
+# Reporting
+# ------------------------
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print p50 changes against a baseline run; return the names that regressed beyond `threshold`."""
+    regressions = []
+    if baseline.get("stubs") != results["stubs"]:
+        print(f"⚠️ Baseline stubs {baseline.get('stubs')} differ from this run's {results['stubs']}")
+    for name, stats in results["benchmarks"].items():
+        old = baseline.get("benchmarks", {}).get(name)
+        if not old or "p50_ms" not in old or "p50_ms" not in stats or not old["p50_ms"]:
+            continue
+        change = stats["p50_ms"] / old["p50_ms"] - 1
+        flag = "❌" if change > threshold else "  "
+        print(f"{flag} {name:<60} {old['p50_ms']:9.2f} -> {stats['p50_ms']:9.2f} ms ({change:+.0%})")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every stage of the analysis pipeline.")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--only", nargs="*", choices=["text", "ocr", "face", "tips", "app"],
+                        help="run only these groups")
+    parser.add_argument("--allow-download", action="store_true",
+                        help="download missing models instead of stubbing them")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="p50 slowdown that counts as a regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    if not args.allow_download:
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    stubs = install_stubs()
+    print(f"Stubbed: {', '.join(stubs) or 'nothing'}")
+
+    groups = {"text": bench_text, "ocr": bench_ocr, "face": bench_face, "tips": bench_tips, "app": bench_app}
+    benchmarks = {}
+    for name, bench in groups.items():
+        if args.only and name not in args.only:
+            continue
+        print(f"⏱️ {name} ...")
+        benchmarks.update(bench(args.iterations))
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "iterations": args.iterations,
+        },
+        "stubs": stubs,
+        "benchmarks": benchmarks,
+    }
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Results written to {args.output}")
+
+    for name, stats in benchmarks.items():
+        print(f"   {name:<60} p50 {stats['p50_ms']:9.2f} ms   p99 {stats['p99_ms']:9.2f} ms")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) over {args.max_regression:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/synthetic.py
+"""
+Synthetic, seeded inputs for the benchmarks: diary corpora of a given length
+and keyword density, rendered text images and face-sized images. Nothing is
+read from disk, so every machine benchmarks the same inputs.
+"""
+import random
+
+from PIL import Image, ImageDraw, ImageFont
+
+KEYWORD_SENTENCES = [
+    "I felt anxious before the meeting",
+    "Everything seems hopeless lately",
+    "I am so stressed about the exams",
+    "Feeling lonely in the evenings",
+    "I was really happy to see my friends",
+    "Work was great and I feel motivated",
+    "I keep worrying about money",
+]
+
+PLAIN_SENTENCES = [
+    "The bus was late again this morning",
+    "I cooked dinner and watched a film",
+    "We talked about the weekend plans",
+    "The office was quiet after lunch",
+    "I walked home through the park",
+    "My sister called in the afternoon",
+    "I read a few chapters before bed",
+]
+
+
+def diary_entry(n_sentences, keyword_density=0.5, seed=0):
+    """A diary entry of `n_sentences` lines, `keyword_density` of them containing lexicon keywords."""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(n_sentences):
+        pool = KEYWORD_SENTENCES if rng.random() < keyword_density else PLAIN_SENTENCES
+        lines.append(rng.choice(pool))
+    return "\n".join(lines)
+
+
+def diary_corpus(n_entries, n_sentences, keyword_density=0.5, seed=0):
+    return [diary_entry(n_sentences, keyword_density, seed + i) for i in range(n_entries)]
+
+
+def text_image(text, font_size=28, width=1000, margin=30):
+    """Render `text` (one line per line of text) black on white, like a clean screenshot."""
+    font = ImageFont.load_default(size=font_size)
+    lines = text.split("\n")
+    line_height = int(font_size * 1.5)
+    image = Image.new("RGB", (width, 2 * margin + line_height * len(lines)), "white")
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines):
+        draw.text((margin, margin + i * line_height), line, fill="black", font=font)
+    return image
+
+
+def face_image(size=224, seed=0):
+    """A face-sized image with a simple drawn face on a noisy background."""
+    rng = random.Random(seed)
+    image = Image.effect_noise((size, size), 40).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    s = size
+    draw.ellipse((s * 0.2, s * 0.1, s * 0.8, s * 0.9), fill=(224, 188, 160))
+    for x in (0.38, 0.62):
+        draw.ellipse((s * (x - 0.05), s * 0.38, s * (x + 0.05), s * 0.46), fill=(40, 40, 40))
+    mouth = rng.choice([(0, 180), (180, 360)])  # smile or frown
+    draw.arc((s * 0.35, s * 0.55, s * 0.65, s * 0.75), *mouth, fill=(120, 30, 30), width=3)
+    return image
@@ -0,0 +1,3 @@
+# utils/__init__.py
+# Keep this import cheap: models are loaded lazily by utils.model_registry.
+from utils.model_registry import get_model, warmup, load_times
@@ -1,12 +1,145 @@
 # utils/analyze_text.py
-from transformers import pipeline
+import json
+import os
+import threading
+
+from utils.cache import make_key, normalize_text, text_cache
+from utils.lexicon import get_lexicon
+from utils.metrics import inc, span
+from utils.model_registry import SENTIMENT_VERSION, get_model
+
+DEFAULT_BATCH_SIZE = 16
+
+# Long texts are classified over overlapping token windows instead of being truncated
+WINDOW_OVERLAP = int(os.environ.get("WINDOW_OVERLAP", "64"))
+WEIGHT_WINDOWS_BY_LENGTH = os.environ.get("WEIGHT_WINDOWS_BY_LENGTH", "0") == "1"
+
+# Pool model calls from concurrent requests into shared batches (see utils/micro_batcher.py)
+MICROBATCH_ENABLED = os.environ.get("MICROBATCH", "0") == "1"
+MICROBATCH_MAX_SIZE = int(os.environ.get("MICROBATCH_MAX_SIZE", "32"))
+MICROBATCH_MAX_WAIT_MS = float(os.environ.get("MICROBATCH_MAX_WAIT_MS", "10"))
+
+_sentiment_batchers = {}  # model batch size -> MicroBatcher
+_batcher_lock = threading.Lock()
+
+
+def __getattr__(name):
+    # Keep `from utils.analyze_text import sentiment_classifier` working
+    # without loading the model at import time.
+    if name == "sentiment_classifier":
+        return get_model("sentiment")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _keyword_state(scores):
+    """Keyword-based detection from lexicon scores. Returns (label, score) or None if nothing matched."""
+    label = get_lexicon().best_label(scores)
+    if label:
+        return label, 0.95
+    return None
+
+
+def _cache_key(text):
+    return make_key(
+        "mental_state", SENTIMENT_VERSION, get_lexicon().version,
+        f"windows:{WINDOW_OVERLAP}:{WEIGHT_WINDOWS_BY_LENGTH}", normalize_text(text),
+    )
+
+
+def classify_texts(texts, batch_size=DEFAULT_BATCH_SIZE, weight_by_length=WEIGHT_WINDOWS_BY_LENGTH,
+                   overlap=WINDOW_OVERLAP, classifier=None):
+    """
+    Run the sentiment model over the full length of each text.
+    Output: list of {'label', 'score'} dicts, in the same order as the input
+
+    Every text is tokenized once and cut into overlapping windows at the
+    model's max length. All windows of all texts go through the model
+    together in padded mini-batches, and each text's label is the argmax of
+    its windows' averaged probabilities (weighted by window length if asked).
+    `classifier` defaults to the registry's sentiment pipeline.
+    """
+    import torch
+
+    texts = list(texts)  # may be a generator; it is walked twice below
+    if not texts:
+        return []
+    classifier = classifier or get_model("sentiment")
+    tokenizer, model = classifier.tokenizer, classifier.model
+    max_length = min(tokenizer.model_max_length, model.config.max_position_embeddings)
+    special = tokenizer.num_special_tokens_to_add()
+
+    # Tokenize once; the (fast) tokenizer emits the overlapping windows itself
+    encoded = tokenizer(
+        texts,
+        truncation=True,
+        max_length=max_length,
+        stride=min(overlap, (max_length - special) // 2),
+        return_overflowing_tokens=True,
+    )
+    windows = [  # (text index, window length, input ids)
+        (i, len(ids) - special, ids)
+        for i, ids in zip(encoded["overflow_to_sample_mapping"], encoded["input_ids"])
+    ]
+
+    # Sorting by length keeps padding inside each mini-batch small
+    order = sorted(range(len(windows)), key=lambda j: len(windows[j][2]))
+    probs = [None] * len(windows)
+    inc("sentiment_windows_total", len(windows))
+    with span("sentiment_model"), torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            batch = tokenizer.pad({"input_ids": [windows[j][2] for j in chunk]}, return_tensors="pt")
+            logits = model(input_ids=batch["input_ids"], attention_mask=batch["attention_mask"]).logits
+            for j, p in zip(chunk, logits.softmax(-1).tolist()):
+                probs[j] = p
+
+    totals = [[0.0] * model.config.num_labels for _ in texts]
+    weights = [0.0] * len(texts)
+    for (i, length, _), p in zip(windows, probs):
+        weight = max(1, length) if weight_by_length else 1.0
+        for k, prob in enumerate(p):
+            totals[i][k] += prob * weight
+        weights[i] += weight
+
+    id2label = model.config.id2label
+    results = []
+    for total, weight in zip(totals, weights):
+        averaged = [t / weight for t in total]
+        best = max(range(len(averaged)), key=averaged.__getitem__)
+        results.append({'label': id2label[best], 'score': averaged[best]})
+    return results
+
+
+def sentiment_batcher(batch_size=DEFAULT_BATCH_SIZE):
+    """The shared micro-batcher in front of classify_texts for `batch_size`, created on first use."""
+    batcher = _sentiment_batchers.get(batch_size)
+    if batcher is None:
+        from utils.micro_batcher import MicroBatcher
+
+        with _batcher_lock:
+            batcher = _sentiment_batchers.get(batch_size)
+            if batcher is None:
+                batcher = _sentiment_batchers[batch_size] = MicroBatcher(
+                    lambda texts: classify_texts(texts, batch_size), MICROBATCH_MAX_SIZE, MICROBATCH_MAX_WAIT_MS,
+                    name="sentiment",
+                )
+    return batcher
+
+
+def _classify(texts, batch_size=DEFAULT_BATCH_SIZE):
+    if MICROBATCH_ENABLED:
+        # Pooled with other callers' texts, but still run in model batches of `batch_size`
+        return sentiment_batcher(batch_size).predict(texts)
+    return classify_texts(texts, batch_size)
+
+
+def _sentiment_to_state(result):
+    """Map a sentiment pipeline result onto our mental state labels."""
+    if result['label'] == 'POSITIVE':
+        return 'Positive/Neutral', result['score']
+    else:
+        return 'Depression/Stress', result['score']
 
-# Force PyTorch backend
-sentiment_classifier = pipeline(
-    "text-classification",
-    model="distilbert-base-uncased-finetuned-sst-2-english",
-    framework="pt"  # force PyTorch
-)
 
 def predict_mental_state(text):
     """
@@ -14,23 +147,96 @@ def predict_mental_state(text):
     Output: label (Anxiety, Depression/Stress, Positive/Neutral, Neutral) and confidence score
     """
 
-    text_lower = text.lower()
+    key = _cache_key(text)
+    state = text_cache.get(key)
+    if state is not None:
+        inc("mental_state_predictions_total", source="cache")
+        return state
 
     # 1️⃣ Keyword-based detection
-    if any(word in text_lower for word in ['anxious', 'anxiety', 'nervous', 'worried', 'panic']):
-        return 'Anxiety', 0.95
-    elif any(word in text_lower for word in ['depressed', 'depression', 'sad', 'unhappy', 'lonely', 'stress']):
-        return 'Depression/Stress', 0.95
-    elif any(word in text_lower for word in ['happy', 'joy', 'excited', 'good', 'great', 'motivated']):
-        return 'Positive/Neutral', 0.95
+    state = _keyword_state(get_lexicon().scores(text))
+    if state is None:
+        # fallback to sentiment model, over the whole text
+        state = _sentiment_to_state(_classify([text])[0])
+        inc("mental_state_predictions_total", source="model")
     else:
-        # fallback to sentiment model
-        result = sentiment_classifier(text[:512])  # limit to 512 tokens
-        label = result[0]['label']
-        score = result[0]['score']
-
-        if label == 'POSITIVE':
-            return 'Positive/Neutral', score
-        else:
-            return 'Depression/Stress', score
-        
\ No newline at end of file
+        inc("mental_state_predictions_total", source="keyword")
+
+    text_cache.set(key, state)
+    return state
+
+
+def predict_mental_state_batch(texts, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Input: list of text strings
+    Output: list of (label, confidence score) tuples, in the same order as the input
+
+    Runs the keyword pass over every text first and sends only the leftovers
+    through the sentiment model, in padded mini-batches of `batch_size`.
+    Texts already in the result cache skip both.
+    """
+    keys = [_cache_key(text) for text in texts]
+    results = [text_cache.get(key) for key in keys]
+    todo = [i for i, state in enumerate(results) if state is None]
+
+    # 1️⃣ Keyword-based detection, one pass over all uncached texts
+    for i, scores in zip(todo, get_lexicon().scores_batch([texts[i] for i in todo])):
+        results[i] = _keyword_state(scores)
+
+    # 2️⃣ Batch the texts the keywords could not decide
+    pending = [i for i in todo if results[i] is None]
+    inc("mental_state_predictions_total", len(texts) - len(todo), source="cache")
+    inc("mental_state_predictions_total", len(todo) - len(pending), source="keyword")
+    inc("mental_state_predictions_total", len(pending), source="model")
+    if pending:
+        outputs = _classify([texts[i] for i in pending], batch_size)
+        for i, output in zip(pending, outputs):
+            results[i] = _sentiment_to_state(output)
+
+    for i in todo:
+        text_cache.set(keys[i], results[i])
+    return results
+
+
+def analyze_sentences(sentences, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Classify a list of sentences in one batched pass.
+    Output: list of dicts with sentence, detected_label, sentiment_label,
+    sentiment_score (signed, negative for NEGATIVE) and scale (1-10).
+    """
+    analysis = []
+    for sentence, (label, score) in zip(sentences, predict_mental_state_batch(sentences, batch_size)):
+        positive = label == 'Positive/Neutral'
+        analysis.append({
+            'sentence': sentence,
+            'detected_label': label,
+            'sentiment_label': 'POSITIVE' if positive else 'NEGATIVE',
+            'sentiment_score': score if positive else -score,
+            'scale': max(1, min(10, round(score * 10))),
+        })
+    return analysis
+
+
+# ------------------------
+# JSON endpoint
+# ------------------------
+def _classify_route(body):
+    try:
+        texts = json.loads(body or b"{}")["texts"]
+        if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+            raise ValueError
+    except (ValueError, KeyError, TypeError):
+        return 400, "application/json", json.dumps({"error": 'expected {"texts": ["...", ...]}'})
+
+    results = [{"text": text, "label": label, "score": score}
+               for text, (label, score) in zip(texts, predict_mental_state_batch(texts))]
+    return 200, "application/json", json.dumps({"results": results})
+
+
+def start_classify_server(port=None, host=None):
+    """Expose POST /classify {"texts": [...]} on the local side server (shared with /metrics)."""
+    from utils.http_server import add_route, start_server
+    from utils.metrics import METRICS_PORT
+
+    add_route("POST", "/classify", _classify_route)
+    return start_server(METRICS_PORT if port is None else port, host or os.environ.get("METRICS_HOST", "127.0.0.1"))
@@ -0,0 +1,183 @@
+# utils/cache.py
+"""
+Content-addressed cache for analysis results.
+
+Keys are SHA-256 hashes of the normalized input (text, or image bytes) plus
+whatever versions the result depends on (model, lexicon, OCR engine). Each
+cache is an in-process LRU, optionally backed by a SQLite file shared between
+processes and restarts (ANALYSIS_CACHE_DB). Entries expire after
+ANALYSIS_CACHE_TTL seconds; both tiers are bounded in size.
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+ANALYSIS_CACHE_SIZE = int(os.environ.get("ANALYSIS_CACHE_SIZE", "4096"))
+ANALYSIS_CACHE_TTL = float(os.environ.get("ANALYSIS_CACHE_TTL", str(7 * 24 * 3600)))
+ANALYSIS_CACHE_DB = os.environ.get("ANALYSIS_CACHE_DB")  # unset = memory only
+ANALYSIS_CACHE_DISK_SIZE = int(os.environ.get("ANALYSIS_CACHE_DISK_SIZE", "100000"))
+
+
+def normalize_text(text):
+    """Lower-case and collapse whitespace. The classifier is uncased and ignores spacing."""
+    return " ".join(text.lower().split())
+
+
+def make_key(*parts):
+    """SHA-256 over the given str/bytes parts."""
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        h.update(len(part).to_bytes(8, "little"))
+        h.update(part)
+    return h.hexdigest()
+
+
+def image_fingerprint(image):
+    """Bytes identifying an image: file bytes for a path or encoded bytes, pixels for a PIL image or array."""
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return bytes(image)
+    if isinstance(image, (str, os.PathLike)):
+        with open(image, "rb") as f:
+            return f.read()
+    if hasattr(image, "dtype"):
+        # NumPy array
+        return f"{image.dtype}:{image.shape}".encode() + image.tobytes()
+    # PIL image
+    return f"{image.mode}:{image.size}".encode() + image.tobytes()
+
+
+class _DiskStore:
+    """SQLite tier shared by all caches, one namespace per cache."""
+
+    def __init__(self, path, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL,"
+            " created REAL NOT NULL, PRIMARY KEY (namespace, key))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_created ON results (created)")
+        self._conn.commit()
+        self._writes = 0
+
+    def get(self, namespace, key, ttl):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM results WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            if ttl and time.time() - row[1] > ttl:
+                self._conn.execute("DELETE FROM results WHERE namespace = ? AND key = ?", (namespace, key))
+                self._conn.commit()
+                return None
+        return pickle.loads(row[0])
+
+    def set(self, namespace, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (namespace, key, value, created) VALUES (?, ?, ?, ?)",
+                (namespace, key, blob, time.time()),
+            )
+            self._writes += 1
+            # Trim the oldest rows every so often rather than on every write
+            if self._writes % 256 == 0:
+                self._conn.execute(
+                    "DELETE FROM results WHERE rowid IN ("
+                    " SELECT rowid FROM results ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            self._conn.commit()
+
+
+_disk_stores = {}
+_disk_lock = threading.Lock()
+
+
+def _disk_store(path):
+    with _disk_lock:
+        if path not in _disk_stores:
+            _disk_stores[path] = _DiskStore(path, ANALYSIS_CACHE_DISK_SIZE)
+        return _disk_stores[path]
+
+
+class ResultCache:
+    def __init__(self, namespace, max_entries=ANALYSIS_CACHE_SIZE, ttl=ANALYSIS_CACHE_TTL, disk_path=ANALYSIS_CACHE_DB):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._disk = _disk_store(disk_path) if disk_path else None
+        self._entries = OrderedDict()  # key -> (created, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self.ttl or now - entry[0] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.evictions += 1
+
+        value = self._disk.get(self.namespace, key, self.ttl) if self._disk else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return default
+            self.disk_hits += 1
+            self._store(key, value, now)
+        return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._store(key, value, time.time())
+        if self._disk:
+            self._disk.set(self.namespace, key, value)
+
+    def _store(self, key, value, created):
+        self._entries[key] = (created, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Shared caches
+text_cache = ResultCache("mental_state")
+ocr_cache = ResultCache("ocr")
+
+
+def cache_stats():
+    return {cache.namespace: cache.stats() for cache in (text_cache, ocr_cache)}
@@ -0,0 +1,146 @@
+# utils/face_engine.py
+"""
+Face emotion analysis on in-memory images.
+
+analyze_face() takes a PIL image, NumPy array, encoded bytes or a path and
+returns the (status, raw_emotions, scores) triple app.py consumes:
+    status        "<condition> (<dominant emotion>)"
+    raw_emotions  emotion -> probability (0-1)
+    scores        emotion -> score on a 0-10 scale
+
+The shared FaceEngine keeps an OpenCV face detector next to the emotion
+model. Detection runs on a grayscale copy shrunk to FACE_MAX_SIDE, and only
+the detected face crop goes through the classifier. analyze_faces() and
+analyze_group() classify many crops in one batch. Without OpenCV, or when no
+face is found, the whole image is classified as before.
+"""
+import os
+import threading
+
+from utils.images import to_pil
+from utils.metrics import span
+from utils.model_registry import get_model
+
+FACE_MAX_SIDE = int(os.environ.get("FACE_MAX_SIDE", "640"))   # detection resolution
+FACE_MIN_SIZE = int(os.environ.get("FACE_MIN_SIZE", "40"))    # smallest face, in detection pixels
+FACE_MARGIN = 0.2                                             # context kept around a detected face
+FACE_BATCH_SIZE = int(os.environ.get("FACE_BATCH_SIZE", "8"))
+
+# Facial expressions mapped onto the conditions the rest of the app uses
+EMOTION_CONDITIONS = {
+    "happy": "Positive / Healthy",
+    "neutral": "Neutral",
+    "surprise": "Neutral",
+    "sad": "Depression/Stress",
+    "disgust": "Depression/Stress",
+    "angry": "Depression/Stress",
+    "fear": "Anxiety",
+}
+
+
+def _result_to_status(predictions):
+    raw_emotions = {p["label"].lower(): p["score"] for p in predictions}
+    if not raw_emotions:
+        return "No emotions detected", {}, {}
+
+    dominant = max(raw_emotions, key=raw_emotions.get)
+    condition = EMOTION_CONDITIONS.get(dominant, "Neutral")
+    scores = {emotion.capitalize(): prob * 10 for emotion, prob in raw_emotions.items()}
+    return f"{condition} ({dominant})", raw_emotions, scores
+
+
+def _build_detector():
+    import cv2
+
+    return cv2.CascadeClassifier(os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml"))
+
+
+class FaceEngine:
+    def __init__(self, max_side=FACE_MAX_SIDE, batch_size=FACE_BATCH_SIZE, detector_builder=_build_detector):
+        self.max_side = max_side
+        self.batch_size = batch_size
+        self._detector_builder = detector_builder
+        self._detector = None
+        self._detector_ready = False
+        # CascadeClassifier is not safe to share between threads mid-call
+        self._lock = threading.Lock()
+
+    def detector(self):
+        """The face detector, built on first use; None when OpenCV is unavailable."""
+        if not self._detector_ready:
+            with self._lock:
+                if not self._detector_ready:
+                    try:
+                        self._detector = self._detector_builder()
+                    except Exception as e:
+                        print(f"⚠️ Face detector unavailable, classifying whole images: {e}")
+                    self._detector_ready = True
+        return self._detector
+
+    def detect(self, image):
+        """Face boxes (left, top, right, bottom) in `image` coordinates, largest first."""
+        import numpy as np
+
+        detector = self.detector()
+        if detector is None:
+            return []
+
+        # Detect on a small grayscale copy (shrunk before converting), then map the boxes back
+        scale = min(1.0, self.max_side / max(image.size))
+        small = image
+        if scale < 1.0:
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            small = image.resize(size, reducing_gap=2.0)
+        small = small.convert("L")
+        with self._lock:
+            found = detector.detectMultiScale(
+                np.asarray(small), scaleFactor=1.1, minNeighbors=5, minSize=(FACE_MIN_SIZE, FACE_MIN_SIZE)
+            )
+
+        boxes = []
+        for x, y, w, h in sorted(found, key=lambda box: box[2] * box[3], reverse=True):
+            pad_x, pad_y = w * FACE_MARGIN, h * FACE_MARGIN
+            boxes.append((
+                max(0, round((x - pad_x) / scale)),
+                max(0, round((y - pad_y) / scale)),
+                min(image.width, round((x + w + pad_x) / scale)),
+                min(image.height, round((y + h + pad_y) / scale)),
+            ))
+        return boxes
+
+    def crops(self, image, every_face=False):
+        """Detected face crops (largest only unless `every_face`), or the whole image if none."""
+        image = to_pil(image)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        with span("face_detect"):
+            boxes = self.detect(image)
+        if not boxes:
+            return [image]
+        return [image.crop(box) for box in (boxes if every_face else boxes[:1])]
+
+    def classify(self, crops):
+        """(status, raw_emotions, scores) for each crop, in one classifier batch."""
+        if not crops:
+            return []
+        with span("face_model"):
+            predictions = get_model("face")(crops, top_k=None, batch_size=self.batch_size)
+        return [_result_to_status(p) for p in predictions]
+
+
+face_engine = FaceEngine()
+
+
+def analyze_face(image):
+    """Classify the facial expression in `image`. Returns (status, raw_emotions, scores)."""
+    return analyze_faces([image])[0]
+
+
+def analyze_faces(images):
+    """analyze_face() for many images; the face crops are classified in one batch."""
+    return face_engine.classify([face_engine.crops(image)[0] for image in images])
+
+
+def analyze_group(image):
+    """One (status, raw_emotions, scores) per face found in `image`, largest face first."""
+    return face_engine.classify(face_engine.crops(image, every_face=True))
@@ -1,31 +1,184 @@
 # health_tips.py
+"""
+Wellness content: health tips, food suggestions and educational medication
+info per mental state.
+
+The content lives in utils/data/wellness.json and is loaded once into a
+WellnessCatalog of tuples indexed by condition. The static markdown for each
+condition (foods and medication info) is rendered once per catalog and then
+reused. Editing the file takes effect without a restart: get_catalog()
+checks its modification time every WELLNESS_RELOAD_SECONDS.
+
+The catalog's aliases map the face and fallback labels ("Positive / Healthy",
+"Neutral") onto a condition for the report helpers; get_health_tips() keeps
+its exact-name lookup.
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from types import MappingProxyType
+
+WELLNESS_PATH = os.environ.get(
+    "WELLNESS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "wellness.json"),
+)
+WELLNESS_RELOAD_SECONDS = float(os.environ.get("WELLNESS_RELOAD_SECONDS", "2"))  # 0 = never reload
+
+_catalog = None
+_catalog_mtime = None
+_last_check = 0.0
+_lock = threading.Lock()
+
+
+class WellnessCatalog:
+    def __init__(self, data, version=""):
+        self.version = version
+        self.aliases = MappingProxyType(dict(data.get("aliases", {})))
+        self.default_tips = tuple(data.get("default_tips", ()))
+        conditions = data.get("conditions", {})
+        self.tips = MappingProxyType({c: tuple(v.get("tips", ())) for c, v in conditions.items()})
+        self.foods = MappingProxyType({c: tuple(v.get("foods", ())) for c, v in conditions.items()})
+
+        medication = data.get("medication", {})
+        self.disclaimer = medication.get("disclaimer", "")
+        self.advice = medication.get("advice", "")
+        by_condition = {}
+        for name, info in medication.get("classes", {}).items():
+            entry = (name, info["description"], tuple(info.get("examples_in_india", ())))
+            for condition in info.get("conditions", ()):
+                by_condition.setdefault(condition, []).append(entry)
+        self.medication = MappingProxyType({c: tuple(v) for c, v in by_condition.items()})
+
+        self._markdown = {}  # (condition, n) -> rendered static sections
+
+    def resolve(self, condition):
+        condition = (condition or "").strip()
+        return self.aliases.get(condition, condition)
+
+    def markdown(self, condition, n=3):
+        """Food suggestions and medication info for `condition`, rendered once and reused."""
+        key = (self.resolve(condition), n)
+        md = self._markdown.get(key)
+        if md is None:
+            condition = key[0]
+            parts = ["\n## 🥗 Food Suggestions\n"]
+            parts.extend(f"- {food}\n" for food in self.foods.get(condition, ()))
+            parts.append("\n## 💊 Medication Info (Educational Only)\n")
+            parts.append(f"{self.disclaimer}\n\n")
+            for name, description, examples in self.medication.get(condition, ())[:n]:
+                parts.append(f"**{name}**: {description}\n")
+                parts.append("Examples in India: " + ", ".join(examples) + "\n\n")
+            parts.append(self.advice)
+            md = self._markdown[key] = "".join(parts)
+        return md
+
+
+def load_catalog(path=WELLNESS_PATH):
+    with open(path, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw)
+    version = f"{data.get('version', 0)}-{hashlib.sha256(raw).hexdigest()[:12]}"
+    return WellnessCatalog(data, version)
+
+
+def reload_catalog(path=None):
+    """Load the catalog file again now. A broken file keeps the previous catalog."""
+    global _catalog, _catalog_mtime
+    path = path or WELLNESS_PATH
+    with _lock:
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            mtime = None
+        try:
+            catalog = load_catalog(path)
+        except (OSError, ValueError, KeyError) as e:
+            if _catalog is None:
+                raise
+            _catalog_mtime = mtime  # do not retry until the file changes again
+            print(f"⚠️ Could not reload {path}, keeping the current catalog: {e}")
+            return _catalog
+        _catalog, _catalog_mtime = catalog, mtime
+        return catalog
+
+
+def get_catalog():
+    """The wellness catalog, loaded on first use and reloaded when the file changes."""
+    global _last_check
+    catalog = _catalog
+    if catalog is None:
+        return reload_catalog()
+
+    now = time.monotonic()
+    if WELLNESS_RELOAD_SECONDS and now - _last_check >= WELLNESS_RELOAD_SECONDS:
+        _last_check = now
+        try:
+            changed = os.stat(WELLNESS_PATH).st_mtime != _catalog_mtime
+        except OSError:
+            changed = False
+        if changed:
+            return reload_catalog()
+    return catalog
+
 
 def get_health_tips(state):
     """
     Return daily health tips based on the mental state.
     """
-    state = state.strip()  # Remove extra spaces
-    tips_dict = {
-        "Depression/Stress": [
-            "Go outside and get sunlight daily.",
-            "Exercise 20-30 minutes each day.",
-            "Maintain a consistent sleep schedule (7-9 hours).",
-            "Practice mindfulness or meditation.",
-            "Connect with friends or family and share your feelings."
-        ],
-        "Anxiety": [
-            "Practice deep breathing exercises.",
-            "Write down your worries and possible solutions.",
-            "Limit caffeine and sugar intake.",
-            "Take short breaks from stressful activities.",
-            "Engage in hobbies that relax your mind."
-        ],
-        "Positive/Neutral": [
-            "Keep up your good mental habits.",
-            "Maintain regular exercise and healthy diet.",
-            "Continue connecting with loved ones.",
-            "Try new activities that make you happy."
-        ]
+    catalog = get_catalog()
+    # Default tips if the state is unknown (no aliases: "Neutral" is unknown here)
+    return list(catalog.tips.get(state.strip(), catalog.default_tips))
+
+
+def _random_tips(catalog, condition, n, rng):
+    tips = catalog.tips.get(catalog.resolve(condition)) or catalog.default_tips
+    return (rng or random).sample(tips, min(n, len(tips)))
+
+
+def _medication_info(catalog, condition, n):
+    return {
+        "disclaimer": catalog.disclaimer,
+        "classes": {
+            name: {"description": description, "examples_in_india": list(examples)}
+            for name, description, examples in catalog.medication.get(catalog.resolve(condition), ())[:n]
+        },
+        "advice": catalog.advice,
+    }
+
+
+def get_random_tips(condition, n=5, rng=None):
+    """Up to `n` tips for `condition`, in random order (pass `rng` for repeatable picks)."""
+    return _random_tips(get_catalog(), condition, n, rng)
+
+
+def get_food_suggestions(condition):
+    catalog = get_catalog()
+    return list(catalog.foods.get(catalog.resolve(condition), ()))
+
+
+def medication_info_education(condition, n=3):
+    """Educational info on up to `n` medication classes used for `condition`."""
+    return _medication_info(get_catalog(), condition, n)
+
+
+def wellness_markdown(condition, n=3):
+    """The static food and medication sections of the report for `condition`."""
+    return get_catalog().markdown(condition, n)
+
+
+def wellness_report(condition, n_tips=5, n_medication=3, rng=None):
+    """
+    Tips, foods, medication info and the rendered food/medication markdown for
+    `condition`, all from one catalog, so the UI and the PDF of a request show
+    the same content even if the file is reloaded in between.
+    """
+    catalog = get_catalog()
+    return {
+        "tips": _random_tips(catalog, condition, n_tips, rng),
+        "foods": list(catalog.foods.get(catalog.resolve(condition), ())),
+        "medication": _medication_info(catalog, condition, n_medication),
+        "markdown": catalog.markdown(condition, n_medication),
     }
-    # Default tips if the state is unknown
-    return tips_dict.get(state, ["Maintain a healthy routine and positive mindset."])
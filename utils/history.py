@@ -0,0 +1,211 @@
+# utils/history.py
+"""
+Mood history per user, in SQLite.
+
+record() stores one row per analysis (condition, sentence label counts,
+average scale, confidence) and folds it into per-day totals and into rolling
+7- and 30-day aggregates. The rolling rows are kept current incrementally:
+when the calendar moves on, the days that slid out of the window are
+subtracted instead of rescanning the history. So trend() reads two
+precomputed rows, and daily_series() reads at most one row per day shown.
+The same input (by its seed) is stored at most once per user per day.
+
+History is off unless MOOD_HISTORY_ENABLED=1. There are no accounts: the
+"user" is whatever key is typed into the UI, and anyone who types the same
+key sees the same trend. So the key should be a private passphrase rather
+than a name, it must be at least HISTORY_KEY_MIN_LENGTH characters, and the
+database only stores its HMAC (with MOOD_HISTORY_SECRET, which should be set
+to a random value on any shared deployment) via history_key().
+"""
+import hashlib
+import hmac
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+HISTORY_ENABLED = os.environ.get("MOOD_HISTORY_ENABLED", "0") == "1"
+HISTORY_DB = os.environ.get("MOOD_HISTORY_DB", "mood_history.sqlite3")
+HISTORY_SECRET = os.environ.get("MOOD_HISTORY_SECRET", "")
+HISTORY_KEY_MIN_LENGTH = int(os.environ.get("MOOD_HISTORY_KEY_MIN_LENGTH", "12"))
+TREND_WINDOWS = (7, 30)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY, user_id TEXT NOT NULL, day TEXT NOT NULL, created REAL NOT NULL,
+    condition TEXT NOT NULL, label_counts TEXT NOT NULL, avg_scale REAL NOT NULL, confidence REAL NOT NULL,
+    seed TEXT);
+CREATE INDEX IF NOT EXISTS entries_user_day ON entries (user_id, day);
+CREATE TABLE IF NOT EXISTS daily (
+    user_id TEXT NOT NULL, day TEXT NOT NULL, entries INTEGER NOT NULL, scale_sum REAL NOT NULL,
+    confidence_sum REAL NOT NULL, conditions TEXT NOT NULL, PRIMARY KEY (user_id, day));
+CREATE TABLE IF NOT EXISTS rolling (
+    user_id TEXT NOT NULL, window INTEGER NOT NULL, as_of TEXT NOT NULL, entries INTEGER NOT NULL,
+    scale_sum REAL NOT NULL, confidence_sum REAL NOT NULL, conditions TEXT NOT NULL,
+    PRIMARY KEY (user_id, window));
+"""
+
+
+def history_key(user_key, secret=HISTORY_SECRET):
+    """The id stored for a typed history key; None if the key is too short to be private."""
+    user_key = (user_key or "").strip()
+    if len(user_key) < HISTORY_KEY_MIN_LENGTH:
+        return None
+    return hmac.new(secret.encode(), user_key.encode(), hashlib.sha256).hexdigest()
+
+
+def _merge(counts, other, sign=1):
+    for label, n in other.items():
+        counts[label] = counts.get(label, 0) + sign * n
+        if counts[label] <= 0:
+            del counts[label]
+    return counts
+
+
+class HistoryStore:
+    def __init__(self, path=HISTORY_DB, windows=TREND_WINDOWS):
+        self.windows = tuple(windows)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+        if "seed" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN seed TEXT")
+        self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS entries_user_day_seed ON entries (user_id, day, seed)")
+        self._conn.commit()
+
+    # ------------------------
+    # Rolling windows
+    # ------------------------
+    def _daily_rows(self, user_id, after, until):
+        """Daily totals for days in (after, until]."""
+        return self._conn.execute(
+            "SELECT entries, scale_sum, confidence_sum, conditions FROM daily"
+            " WHERE user_id = ? AND day > ? AND day <= ?",
+            (user_id, after.isoformat(), until.isoformat()),
+        ).fetchall()
+
+    def _rolling(self, user_id, window, today):
+        """The window's totals as of `today`, sliding the stored row forward if the day has changed."""
+        row = self._conn.execute(
+            "SELECT as_of, entries, scale_sum, confidence_sum, conditions FROM rolling"
+            " WHERE user_id = ? AND window = ?",
+            (user_id, window),
+        ).fetchone()
+        if row is not None and row[0] == today.isoformat():
+            return row[1], row[2], row[3], json.loads(row[4])
+
+        if row is None or not 0 <= (today - date.fromisoformat(row[0])).days < window:
+            # Nothing to slide from: sum the (at most `window`) days in range
+            entries, scale_sum, confidence_sum, conditions = 0, 0.0, 0.0, {}
+            added, dropped = self._daily_rows(user_id, today - timedelta(days=window), today), []
+        else:
+            as_of = date.fromisoformat(row[0])
+            entries, scale_sum, confidence_sum, conditions = row[1], row[2], row[3], json.loads(row[4])
+            added = self._daily_rows(user_id, as_of, today)
+            dropped = self._daily_rows(user_id, as_of - timedelta(days=window), today - timedelta(days=window))
+
+        for rows, sign in ((added, 1), (dropped, -1)):
+            for n, s, c, conds in rows:
+                entries += sign * n
+                scale_sum += sign * s
+                confidence_sum += sign * c
+                _merge(conditions, json.loads(conds), sign)
+        self._save_rolling(user_id, window, today, entries, scale_sum, confidence_sum, conditions)
+        return entries, scale_sum, confidence_sum, conditions
+
+    def _save_rolling(self, user_id, window, today, entries, scale_sum, confidence_sum, conditions):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO rolling VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (user_id, window, today.isoformat(), entries, scale_sum, confidence_sum, json.dumps(conditions)),
+        )
+
+    # ------------------------
+    # Public API
+    # ------------------------
+    def record(self, user_id, condition, label_counts, avg_scale, confidence, created=None, seed=None):
+        """
+        Store one analysis and fold it into the daily and rolling totals.
+        With a `seed`, a repeat of the same input on the same day is ignored.
+        Returns False if the entry was a repeat.
+        """
+        created = time.time() if created is None else created
+        day = date.fromtimestamp(created)
+        today = max(date.today(), day)
+        with self._lock:
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO entries"
+                " (user_id, day, created, condition, label_counts, avg_scale, confidence, seed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (user_id, day.isoformat(), created, condition, json.dumps(label_counts), avg_scale, confidence, seed),
+            ).rowcount
+            if not inserted:
+                return False
+
+            # Bring the windows up to today first, so the new entry is not counted twice
+            windows = {window: self._rolling(user_id, window, today) for window in self.windows}
+
+            row = self._conn.execute(
+                "SELECT entries, scale_sum, confidence_sum, conditions FROM daily WHERE user_id = ? AND day = ?",
+                (user_id, day.isoformat()),
+            ).fetchone()
+            n, s, c, conds = row if row else (0, 0.0, 0.0, "{}")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO daily VALUES (?, ?, ?, ?, ?, ?)",
+                (user_id, day.isoformat(), n + 1, s + avg_scale, c + confidence,
+                 json.dumps(_merge(json.loads(conds), {condition: 1}))),
+            )
+
+            for window, (entries, scale_sum, confidence_sum, conditions) in windows.items():
+                if (today - day).days < window:
+                    self._save_rolling(
+                        user_id, window, today, entries + 1, scale_sum + avg_scale,
+                        confidence_sum + confidence, _merge(conditions, {condition: 1}),
+                    )
+            self._conn.commit()
+        return True
+
+    def trend(self, user_id, today=None):
+        """
+        {window_days: {"entries", "avg_scale", "avg_confidence", "distribution"}}
+        for each rolling window; distribution maps condition -> share of entries.
+        """
+        today = today or date.today()
+        trend = {}
+        with self._lock:
+            for window in self.windows:
+                entries, scale_sum, confidence_sum, conditions = self._rolling(user_id, window, today)
+                trend[window] = {
+                    "entries": entries,
+                    "avg_scale": scale_sum / entries if entries else None,
+                    "avg_confidence": confidence_sum / entries if entries else None,
+                    "distribution": {label: n / entries for label, n in conditions.items()} if entries else {},
+                }
+            self._conn.commit()
+        return trend
+
+    def daily_series(self, user_id, days=30, today=None):
+        """[(day, entries, avg_scale)] for the last `days` days that have entries, oldest first."""
+        today = today or date.today()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT day, entries, scale_sum FROM daily WHERE user_id = ? AND day > ? AND day <= ? ORDER BY day",
+                (user_id, (today - timedelta(days=days)).isoformat(), today.isoformat()),
+            ).fetchall()
+        return [(day, n, s / n) for day, n, s in rows]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history():
+    """The shared history store at MOOD_HISTORY_DB, opened on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = HistoryStore()
+    return _store
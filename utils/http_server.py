@@ -0,0 +1,62 @@
+# utils/http_server.py
+"""
+Small HTTP side server that runs next to the Gradio app (stdlib only).
+
+Modules register handlers with add_route(); start_server() serves them from
+a daemon thread. A handler takes the request body (bytes) and returns
+(status, content_type, body).
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_routes = {}  # (method, path) -> handler
+_server = None
+_server_lock = threading.Lock()
+
+
+def add_route(method, path, handler):
+    _routes[(method.upper(), path)] = handler
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def _dispatch(self, method):
+        handler = _routes.get((method, self.path.split("?", 1)[0]))
+        if handler is None:
+            self._send(404, "text/plain; charset=utf-8", b"not found\n")
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        try:
+            status, content_type, payload = handler(body)
+        except Exception as e:
+            status, content_type, payload = 500, "text/plain; charset=utf-8", f"error: {e}\n"
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        self._send(status, content_type, payload)
+
+    def _send(self, status, content_type, payload):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def log_message(self, format, *args):
+        pass  # scraped every few seconds; keep the console quiet
+
+
+def start_server(port, host="127.0.0.1"):
+    """Serve the registered routes on host:port from a daemon thread (once per process)."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _Handler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="http-server", daemon=True).start()
+    return _server
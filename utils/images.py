@@ -0,0 +1,38 @@
+# utils/images.py
+"""
+Helpers so the OCR and face entry points can take an image in whatever form
+the caller has it: a file path, a PIL image, a NumPy array or raw encoded
+bytes. Conversions are skipped when the input is already in the wanted form.
+"""
+import io
+import os
+
+from PIL import Image
+
+
+def is_path(image):
+    return isinstance(image, (str, os.PathLike))
+
+
+def to_pil(image):
+    """PIL image from a path, PIL image, NumPy array or encoded bytes."""
+    if isinstance(image, Image.Image):
+        return image
+    if is_path(image):
+        return Image.open(image)
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return Image.open(io.BytesIO(image))
+    # NumPy array (H x W or H x W x C)
+    return Image.fromarray(image)
+
+
+def to_array(image):
+    """NumPy array from a PIL image or NumPy array; arrays are returned as is."""
+    import numpy as np
+
+    if isinstance(image, np.ndarray):
+        return image
+    image = to_pil(image)
+    if image.mode not in ("L", "RGB"):
+        image = image.convert("RGB")
+    return np.asarray(image)
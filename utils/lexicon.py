@@ -0,0 +1,113 @@
+# utils/lexicon.py
+"""
+Keyword lexicon for the first stage of predict_mental_state.
+
+The weighted keyword lists live in utils/data/lexicon.json. They are compiled
+once into a single alternation regex with word boundaries, so one pass over a
+text gives the weighted hits for every label ("sadness" is its own entry,
+"goodbye" no longer counts as "good").
+
+The label is picked by priority tier, as the original keyword checks did: any
+Anxiety hit wins, then Depression/Stress, then Positive/Neutral, however many
+positive words the text also has. The weights only decide between labels that
+share a tier (a "priority" entry may be a list of labels).
+"""
+import bisect
+import hashlib
+import json
+import os
+import re
+import threading
+
+LEXICON_PATH = os.environ.get(
+    "LEXICON_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "lexicon.json"),
+)
+
+# Never appears in a keyword, so matches cannot span two texts of a batch
+_BATCH_SEPARATOR = "\n\x00\n"
+
+_lexicon = None
+_lock = threading.Lock()
+
+
+class Lexicon:
+    def __init__(self, labels, priority=None, version=""):
+        self.version = version
+        self.tiers = [tuple(tier) if isinstance(tier, (list, tuple)) else (tier,) for tier in priority or ()]
+        ranked = [label for tier in self.tiers for label in tier]
+        self.tiers += [(label,) for label in labels if label not in ranked]
+        self.labels = [label for tier in self.tiers for label in tier]
+        self._keywords = {}  # keyword -> (label, weight)
+        for label, words in labels.items():
+            for word, weight in words.items():
+                self._keywords[word.lower()] = (label, float(weight))
+
+        # Longest first, so "panic attack" wins over "panic"
+        alternatives = sorted(self._keywords, key=len, reverse=True)
+        self._pattern = re.compile(
+            r"\b(?:" + "|".join(re.escape(word) for word in alternatives) + r")\b"
+        )
+
+    def _empty(self):
+        return {label: 0.0 for label in self.labels}
+
+    def scores(self, text):
+        """Weighted keyword hits per label for one text."""
+        scores = self._empty()
+        for match in self._pattern.finditer(text.lower()):
+            label, weight = self._keywords[match.group()]
+            scores[label] += weight
+        return scores
+
+    def scores_batch(self, texts):
+        """Weighted keyword hits per label for each text, in one pass over the whole batch."""
+        results = [self._empty() for _ in texts]
+        if not texts:
+            return results
+
+        # Lower-case before joining: lower() can change a string's length
+        lowered = [text.lower() for text in texts]
+        starts = []
+        offset = 0
+        for text in lowered:
+            starts.append(offset)
+            offset += len(text) + len(_BATCH_SEPARATOR)
+
+        joined = _BATCH_SEPARATOR.join(lowered)
+        for match in self._pattern.finditer(joined):
+            label, weight = self._keywords[match.group()]
+            results[bisect.bisect_right(starts, match.start()) - 1][label] += weight
+        return results
+
+    def best_label(self, scores):
+        """
+        The first priority tier with any hits decides; within it the highest
+        score wins, ties going to the earlier label. None if no hits.
+        """
+        for tier in self.tiers:
+            best = None
+            for label in tier:
+                if scores[label] > 0 and (best is None or scores[label] > scores[best]):
+                    best = label
+            if best is not None:
+                return best
+        return None
+
+
+def load_lexicon(path=LEXICON_PATH):
+    with open(path, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw)
+    version = f"{data.get('version', 0)}-{hashlib.sha256(raw).hexdigest()[:12]}"
+    return Lexicon(data["labels"], data.get("priority"), version)
+
+
+def get_lexicon():
+    """The compiled lexicon, built on first use."""
+    global _lexicon
+    if _lexicon is None:
+        with _lock:
+            if _lexicon is None:
+                _lexicon = load_lexicon()
+    return _lexicon
@@ -0,0 +1,167 @@
+# utils/metrics.py
+"""
+Lightweight tracing: span timers around pipeline stages and labelled
+counters, rendered in the Prometheus text format on GET /metrics.
+
+Tracing is off unless ANALYZER_TRACING=1. When it is off, span() hands back
+one shared no-op context manager and inc() returns straight away, so the
+instrumented code pays a function call and nothing more.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+TRACING_ENABLED = os.environ.get("ANALYZER_TRACING", "0") == "1"
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "9464"))
+
+# Upper bounds (seconds) of the span duration histogram buckets
+SPAN_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_NULL_SPAN = nullcontext()
+_lock = threading.Lock()
+_counters = {}  # (name, labels) -> value
+_spans = {}     # stage -> [bucket counts..., +Inf count, sum]
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def inc(name, amount=1, **labels):
+    """Add `amount` to the counter `name` with the given labels."""
+    if not TRACING_ENABLED:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def observe(stage, seconds):
+    """Record one `stage` span of `seconds`."""
+    with _lock:
+        hist = _spans.get(stage)
+        if hist is None:
+            hist = _spans[stage] = [0] * (len(SPAN_BUCKETS) + 1) + [0.0]
+        for i, bound in enumerate(SPAN_BUCKETS):
+            if seconds <= bound:
+                hist[i] += 1
+        hist[len(SPAN_BUCKETS)] += 1
+        hist[-1] += seconds
+
+
+def drain_metrics():
+    """
+    Take every counter and span recorded so far and clear them. A prefork
+    worker ships these with each result for the parent to merge_metrics(), so
+    the parent's /metrics covers the work done in the workers.
+    """
+    with _lock:
+        counters, spans = dict(_counters), {stage: list(hist) for stage, hist in _spans.items()}
+        _counters.clear()
+        _spans.clear()
+    return counters, spans
+
+
+def merge_metrics(metrics):
+    """Add counters and spans taken with drain_metrics() in another process."""
+    counters, spans = metrics
+    with _lock:
+        for key, value in counters.items():
+            _counters[key] = _counters.get(key, 0) + value
+        for stage, other in spans.items():
+            hist = _spans.get(stage)
+            if hist is None:
+                _spans[stage] = list(other)
+            else:
+                for i, value in enumerate(other):
+                    hist[i] += value
+
+
+@contextmanager
+def _timed(stage, timings):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        if TRACING_ENABLED:
+            observe(stage, seconds)
+        if timings is not None:
+            timings[stage] = round(seconds, 4)
+
+
+def span(stage, timings=None):
+    """
+    Time the enclosed block as `stage`. If `timings` (a dict) is given the
+    duration is also stored in it, so a request can report its own stages.
+    """
+    if not TRACING_ENABLED and timings is None:
+        return _NULL_SPAN
+    return _timed(stage, timings)
+
+
+# ------------------------
+# Prometheus exposition
+# ------------------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def render_prometheus():
+    """All metrics in the Prometheus text exposition format."""
+    from utils.cache import cache_stats
+    from utils.model_registry import load_times
+
+    lines = []
+    with _lock:
+        counters = dict(_counters)
+        spans = {stage: list(hist) for stage, hist in _spans.items()}
+
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE analyzer_{name} counter")
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"analyzer_{name}{_format_labels(labels)} {value}")
+
+    lines.append("# HELP analyzer_stage_seconds Time spent in each pipeline stage.")
+    lines.append("# TYPE analyzer_stage_seconds histogram")
+    for stage, hist in sorted(spans.items()):
+        for bound, count in zip(SPAN_BUCKETS, hist):
+            lines.append(f'analyzer_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+        lines.append(f'analyzer_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {hist[len(SPAN_BUCKETS)]}')
+        lines.append(f'analyzer_stage_seconds_count{{stage="{stage}"}} {hist[len(SPAN_BUCKETS)]}')
+        lines.append(f'analyzer_stage_seconds_sum{{stage="{stage}"}} {hist[-1]:.6f}')
+
+    stats = cache_stats()
+    for field in ("hits", "disk_hits", "misses", "evictions"):
+        lines.append(f"# TYPE analyzer_cache_{field}_total counter")
+        for cache, values in sorted(stats.items()):
+            lines.append(f'analyzer_cache_{field}_total{{cache="{cache}"}} {values[field]}')
+    lines.append("# TYPE analyzer_cache_entries gauge")
+    for cache, values in sorted(stats.items()):
+        lines.append(f'analyzer_cache_entries{{cache="{cache}"}} {values["entries"]}')
+
+    lines.append("# TYPE analyzer_model_load_seconds gauge")
+    for model, seconds in sorted(load_times().items()):
+        lines.append(f'analyzer_model_load_seconds{{model="{model}"}} {seconds:.3f}')
+
+    return "\n".join(lines) + "\n"
+
+
+def _metrics_route(body):
+    return 200, "text/plain; version=0.0.4; charset=utf-8", render_prometheus()
+
+
+def start_metrics_server(port=METRICS_PORT, host=os.environ.get("METRICS_HOST", "127.0.0.1")):
+    """Expose GET /metrics on a local side server next to the Gradio app."""
+    from utils.http_server import add_route, start_server
+
+    add_route("GET", "/metrics", _metrics_route)
+    return start_server(port, host)
@@ -0,0 +1,108 @@
+# utils/micro_batcher.py
+"""
+Cross-request micro-batching.
+
+A MicroBatcher sits in front of a batch function (list in, list out, same
+order). Callers from any thread submit single items; an asyncio loop on a
+background thread collects them and flushes a batch when it reaches
+max_batch_size or when the oldest item has waited max_wait_ms. Each caller
+gets its own result back. Batches run one at a time on a worker thread, so
+the next batch fills while the current one is being computed.
+
+If the batch function returns the wrong number of results, every caller in
+that batch gets an error rather than waiting forever, and predict() gives up
+after MICROBATCH_TIMEOUT seconds by default.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from utils.metrics import inc
+
+MICROBATCH_TIMEOUT = float(os.environ.get("MICROBATCH_TIMEOUT", "120"))
+
+
+class MicroBatcher:
+    def __init__(self, fn, max_batch_size=32, max_wait_ms=10.0, name="batcher"):
+        self.fn = fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self._loop = None
+        self._queue = None
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-worker")
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._loop is not None:
+            return
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            ready = threading.Event()
+
+            def run():
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                self._queue = asyncio.Queue()
+                self._loop = loop
+                ready.set()
+                loop.run_until_complete(self._collect())
+
+            threading.Thread(target=run, name=f"{self.name}-loop", daemon=True).start()
+            ready.wait()
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Wait for the previous batch to finish before queuing this one, so items
+            # arriving meanwhile can still join the next batch instead of a backlog
+            await loop.run_in_executor(self._worker, self._run_batch, batch)
+
+    def _run_batch(self, batch):
+        inc("microbatch_batches_total", batcher=self.name)
+        inc("microbatch_items_total", len(batch), batcher=self.name)
+        try:
+            outputs = list(self.fn([item for item, _ in batch]))
+            if len(outputs) != len(batch):
+                raise ValueError(f"{self.name}: batch of {len(batch)} items returned {len(outputs)} results")
+        except Exception as e:
+            inc("microbatch_errors_total", batcher=self.name)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), output in zip(batch, outputs):
+            future.set_result(output)
+
+    def submit(self, item):
+        """Queue one item; returns a concurrent.futures.Future for its result."""
+        self._ensure_started()
+        future = Future()
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (item, future))
+        return future
+
+    def predict(self, items, timeout=MICROBATCH_TIMEOUT):
+        """
+        Blocking: results for `items`, in order. They may be batched with other
+        callers' items. Raises TimeoutError after `timeout` seconds (None waits forever).
+        """
+        futures = [self.submit(item) for item in items]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        return [future.result(None if deadline is None else max(0.0, deadline - time.monotonic()))
+                for future in futures]
+
+    async def apredict(self, items):
+        """predict() for asyncio callers on their own event loop."""
+        return await asyncio.gather(*(asyncio.wrap_future(self.submit(item)) for item in items))
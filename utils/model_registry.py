@@ -0,0 +1,152 @@
+# utils/model_registry.py
+"""
+Central place where the heavy models live.
+
+Nothing is loaded at import time: each model is built on first use through
+get_model(), or up front through warmup(). Load times are recorded so that
+startup and health checks can report them.
+"""
+import os
+import threading
+import time
+
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+# CPU backend for the sentiment classifier: "pt" (PyTorch fp32), "pt-int8"
+# (PyTorch dynamic int8 quantization) or "onnx" (ONNX Runtime, needs optimum)
+SENTIMENT_BACKEND = os.environ.get("SENTIMENT_BACKEND", "pt")
+SENTIMENT_THREADS = int(os.environ.get("SENTIMENT_THREADS", "0"))  # intra-op threads, 0 = library default
+SENTIMENT_BACKENDS = ("pt", "pt-int8", "onnx")
+# Identifies the classifier's outputs, e.g. in cache keys
+SENTIMENT_VERSION = f"{SENTIMENT_MODEL}:{SENTIMENT_BACKEND}"
+FACE_EMOTION_MODEL = os.environ.get("FACE_EMOTION_MODEL", "trpakov/vit-face-expression")
+
+_loaders = {}
+_models = {}
+_load_times = {}
+_locks = {}
+_registry_lock = threading.Lock()
+
+
+# -------------------------------
+# Loaders
+# -------------------------------
+def build_sentiment(backend=SENTIMENT_BACKEND, threads=SENTIMENT_THREADS):
+    """Build the sentiment pipeline on the given backend (see SENTIMENT_BACKENDS)."""
+    if backend not in SENTIMENT_BACKENDS:
+        raise ValueError(f"Unknown sentiment backend {backend!r}, expected one of {SENTIMENT_BACKENDS}")
+
+    if backend == "onnx":
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        from optimum.pipelines import pipeline as ort_pipeline
+        from transformers import AutoTokenizer
+
+        session_options = onnxruntime.SessionOptions()
+        if threads:
+            session_options.intra_op_num_threads = threads
+        model = ORTModelForSequenceClassification.from_pretrained(
+            SENTIMENT_MODEL, export=True, session_options=session_options
+        )
+        return ort_pipeline(
+            "text-classification",
+            model=model,
+            tokenizer=AutoTokenizer.from_pretrained(SENTIMENT_MODEL),
+            accelerator="ort",
+        )
+
+    import torch
+    from transformers import pipeline
+
+    if threads:
+        torch.set_num_threads(threads)
+
+    # Force PyTorch backend
+    classifier = pipeline(
+        "text-classification",
+        model=SENTIMENT_MODEL,
+        framework="pt"  # force PyTorch
+    )
+    if backend == "pt-int8":
+        # Linear layers hold nearly all of DistilBERT's weights and FLOPs
+        classifier.model = torch.ao.quantization.quantize_dynamic(
+            classifier.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    return classifier
+
+
+def _load_sentiment():
+    return build_sentiment()
+
+
+def _load_easyocr():
+    # The shared reader pool, with the English reader built up front
+    from utils.ocr_readers import reader_pool
+
+    return reader_pool.warm(["en"])
+
+
+def _load_face():
+    from transformers import pipeline
+
+    return pipeline(
+        "image-classification",
+        model=FACE_EMOTION_MODEL,
+        framework="pt"
+    )
+
+
+# -------------------------------
+# Registry
+# -------------------------------
+def register_model(name, loader):
+    """Register (or replace) the loader for a model. Drops any loaded instance."""
+    with _registry_lock:
+        _loaders[name] = loader
+        _locks.setdefault(name, threading.Lock())
+        _models.pop(name, None)
+        _load_times.pop(name, None)
+
+
+def get_model(name):
+    """Return the model registered under `name`, loading it on first use."""
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    if name not in _loaders:
+        raise KeyError(f"Unknown model: {name}")
+
+    # One lock per model, so a slow load does not block the others
+    with _locks[name]:
+        model = _models.get(name)
+        if model is None:
+            start = time.perf_counter()
+            model = _loaders[name]()
+            _load_times[name] = time.perf_counter() - start
+            _models[name] = model
+    return model
+
+
+def registered_models():
+    return list(_loaders)
+
+
+def is_loaded(name):
+    return name in _models
+
+
+def load_times():
+    """Seconds spent loading each model that has been loaded so far."""
+    return dict(_load_times)
+
+
+def warmup(names=None):
+    """Load the given models (all registered ones by default) and return their load times."""
+    for name in names or registered_models():
+        get_model(name)
+    return load_times()
+
+
+register_model("sentiment", _load_sentiment)
+register_model("easyocr", _load_easyocr)
+register_model("face", _load_face)
@@ -1,38 +1,216 @@
-from PIL import Image
 import pytesseract
-import easyocr
 import os
+import sys
+import threading
+
+from PIL import Image, ImageOps
+
+from utils.cache import image_fingerprint, make_key, ocr_cache
+from utils.images import is_path, to_array, to_pil
+from utils.metrics import inc, span
+from utils.model_registry import get_model
+
+# Images are scaled down to this DPI (when they say theirs) and this longest side
+OCR_TARGET_DPI = int(os.environ.get("OCR_TARGET_DPI", "300"))
+OCR_MAX_SIDE = int(os.environ.get("OCR_MAX_SIDE", "2000"))
+# Mean Tesseract word confidence (0-100) below which EasyOCR takes over
+OCR_MIN_CONFIDENCE = float(os.environ.get("OCR_MIN_CONFIDENCE", "70"))
+
+# EasyOCR language codes -> Tesseract's
+TESSERACT_LANGS = {"en": "eng", "hi": "hin", "mr": "mar", "ta": "tam", "te": "tel", "bn": "ben"}
 
 # -------------------------------
 # OCR Functions
 # -------------------------------
-def extract_text_pytesseract(image_path):
+# Both take a file path, PIL image, NumPy array or encoded image bytes.
+def extract_text_pytesseract(image):
     """Extract text using pytesseract"""
-    image = Image.open(image_path)
-    text = pytesseract.image_to_string(image)
-    return text.strip()
+    key = make_key("ocr", "pytesseract", image_fingerprint(image))
+    text = ocr_cache.get(key)
+    if text is None:
+        with span("ocr_pytesseract"):
+            text = pytesseract.image_to_string(to_pil(image)).strip()
+        ocr_cache.set(key, text)
+    return text
 
-def extract_text_easyocr(image_path):
+def extract_text_easyocr(image, langs=("en",)):
     """Extract text using easyocr"""
-    reader = easyocr.Reader(['en'])
-    result = reader.readtext(image_path, detail=0)
-    return " ".join(result).strip()
+    key = make_key("ocr", "easyocr", "+".join(langs), image_fingerprint(image))
+    text = ocr_cache.get(key)
+    if text is None:
+        # easyocr reads paths, encoded bytes and arrays itself; only PIL images need converting
+        if not (is_path(image) or isinstance(image, (bytes, bytearray))):
+            image = to_array(image)
+        with get_model("easyocr").reader(langs) as reader, span("ocr_easyocr"):
+            result = reader.readtext(image, detail=0)
+        text = " ".join(result).strip()
+        ocr_cache.set(key, text)
+    return text
+
+
 
 # -------------------------------
-# Test Image Path
+# Preprocessing
 # -------------------------------
-image_path = r"C:\Users\ayush\Downloads\Sentences-with-Depression-Depression-in-a-Sentence-in-English-Sentences-for-Depression.webp"
+def _otsu_threshold(gray):
+    hist = gray.histogram()
+    total = sum(hist)
+    sum_all = sum(i * count for i, count in enumerate(hist))
+    best, threshold = -1.0, 127
+    weight_bg = sum_bg = 0
+    for t, count in enumerate(hist):
+        weight_bg += count
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += t * count
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_all - sum_bg) / weight_fg
+        between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+        if between > best:
+            best, threshold = between, t
+    return threshold
+
+
+def _downscaled_gray(image):
+    image = to_pil(image)
+    scale = 1.0
+    dpi = image.info.get("dpi")
+    if dpi and dpi[0] > OCR_TARGET_DPI:
+        scale = OCR_TARGET_DPI / dpi[0]
+    if max(image.size) * scale > OCR_MAX_SIDE:
+        scale = OCR_MAX_SIDE / max(image.size)
+
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGBA", image.size, "white")
+        image = Image.alpha_composite(background, image)
+    gray = ImageOps.grayscale(image)
+    if scale < 1.0:
+        size = (max(1, round(gray.width * scale)), max(1, round(gray.height * scale)))
+        gray = gray.resize(size, Image.LANCZOS)
+    return gray
+
+
+def _binarize(gray):
+    threshold = _otsu_threshold(gray)
+    return gray.point(lambda p: 255 if p > threshold else 0)
+
+
+def preprocess_for_ocr(image):
+    """Downscaled, grayscale, binarized (Otsu) copy of `image` for Tesseract."""
+    return _binarize(_downscaled_gray(image))
 
-if not os.path.exists(image_path):
-    raise FileNotFoundError(f"Image not found: {image_path}")
 
 # -------------------------------
-# Run OCR
+# Tesseract with word confidences
 # -------------------------------
-print("---- Pytesseract OCR ----")
-text_pytesseract = extract_text_pytesseract(image_path)
-print(text_pytesseract)
+# tesserocr keeps Tesseract loaded in-process; its API objects are not thread
+# safe, so each thread keeps its own, per language
+_tess_local = threading.local()
+
+
+def _tesserocr_api(lang):
+    apis = getattr(_tess_local, "apis", None)
+    if apis is None:
+        apis = _tess_local.apis = {}
+    api = apis.get(lang)
+    if api is None:
+        from tesserocr import PyTessBaseAPI
+
+        api = apis[lang] = PyTessBaseAPI(lang=lang)
+    return api
+
+
+def _words_confidence(confidences):
+    confidences = [float(c) for c in confidences if float(c) >= 0]
+    return sum(confidences) / len(confidences) if confidences else 0.0
+
+
+def _tesseract_read(image, lang):
+    """(text, mean word confidence 0-100, engine) from Tesseract."""
+    try:
+        api = _tesserocr_api(lang)
+    except ImportError:
+        api = None
+
+    if api is not None:
+        api.SetImage(image)
+        text = api.GetUTF8Text().strip()
+        return text, _words_confidence(api.AllWordConfidences()), "tesserocr"
+
+    # One subprocess, returning words and their confidences together
+    data = pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT)
+    lines = {}
+    confidences = []
+    for i, word in enumerate(data["text"]):
+        if not word.strip():
+            continue
+        line = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(line, []).append(word)
+        confidences.append(data["conf"][i])
+    text = "\n".join(" ".join(words) for _, words in sorted(lines.items()))
+    return text, _words_confidence(confidences), "tesseract"
+
+
+def extract_text(image, langs=("en",), min_confidence=OCR_MIN_CONFIDENCE):
+    """
+    Preprocess `image`, read it with Tesseract and fall back to EasyOCR only
+    when Tesseract's mean word confidence is below `min_confidence`.
+    Returns (text, engine), engine being "tesserocr", "tesseract" or "easyocr".
+    """
+    key = make_key("ocr", "cascade", "+".join(langs), str(min_confidence), image_fingerprint(image))
+    cached = ocr_cache.get(key)
+    if cached is not None:
+        return cached
+
+    with span("ocr_preprocess"):
+        gray = _downscaled_gray(image)
+        binary = _binarize(gray)
+
+    tess_lang = "+".join(TESSERACT_LANGS.get(lang, lang) for lang in langs)
+    try:
+        with span("ocr_tesseract"):
+            text, confidence, engine = _tesseract_read(binary, tess_lang)
+    except Exception as e:
+        print(f"⚠️ Tesseract OCR failed, using EasyOCR: {e}")
+        text, confidence, engine = "", 0.0, "tesseract"
+
+    if not text or confidence < min_confidence:
+        # The neural reader gets the grayscale image; binarizing hurts it more than it helps
+        with get_model("easyocr").reader(langs) as reader, span("ocr_easyocr"):
+            result = reader.readtext(to_array(gray), detail=0)
+        text, engine = " ".join(result).strip(), "easyocr"
+
+    inc("ocr_engine_total", engine=engine)
+    result = (text, engine)
+    ocr_cache.set(key, result)
+    return result
+
+
+# Run with: python -m utils.ocr path/to/image
+if __name__ == "__main__":
+    # -------------------------------
+    # Test Image Path
+    # -------------------------------
+    image_path = sys.argv[1] if len(sys.argv) > 1 else r"C:\Users\ayush\Downloads\Sentences-with-Depression-Depression-in-a-Sentence-in-English-Sentences-for-Depression.webp"
+
+    if not os.path.exists(image_path):
+        raise FileNotFoundError(f"Image not found: {image_path}")
+
+    # -------------------------------
+    # Run OCR
+    # -------------------------------
+    print("---- Pytesseract OCR ----")
+    text_pytesseract = extract_text_pytesseract(image_path)
+    print(text_pytesseract)
+
+    print("\n---- EasyOCR ----")
+    text_easyocr = extract_text_easyocr(image_path)
+    print(text_easyocr)
 
-print("\n---- EasyOCR ----")
-text_easyocr = extract_text_easyocr(image_path)
-print(text_easyocr)
+    print("\n---- Cascade ----")
+    text_cascade, engine = extract_text(image_path)
+    print(f"[{engine}] {text_cascade}")
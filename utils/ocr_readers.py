@@ -0,0 +1,146 @@
+# utils/ocr_readers.py
+"""
+Shared EasyOCR readers.
+
+Building an easyocr.Reader loads its detection and recognition networks, so
+readers are kept in a pool keyed by language list and lent out to one caller
+at a time. Concurrent requests each get their own reader (up to
+EASYOCR_POOL_SIZE per language list) and wait for one to come back beyond
+that. EASYOCR_POOL_MAX_MB caps the memory held by all pooled readers; idle
+readers of other language lists are dropped to make room.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+EASYOCR_POOL_SIZE = int(os.environ.get("EASYOCR_POOL_SIZE", "2"))
+EASYOCR_POOL_MAX_MB = float(os.environ.get("EASYOCR_POOL_MAX_MB", "0"))  # 0 = no cap
+
+
+def _build_reader(langs):
+    import easyocr
+
+    return easyocr.Reader(list(langs))
+
+
+def _reader_size_mb(reader):
+    """Parameter memory of a reader's networks, in MB."""
+    total = 0
+    for net in (getattr(reader, "detector", None), getattr(reader, "recognizer", None)):
+        if net is not None and hasattr(net, "parameters"):
+            total += sum(p.numel() * p.element_size() for p in net.parameters())
+    return total / (1024 * 1024)
+
+
+class ReaderPool:
+    def __init__(self, size=EASYOCR_POOL_SIZE, max_mb=EASYOCR_POOL_MAX_MB, builder=_build_reader):
+        self.size = max(1, size)
+        self.max_mb = max_mb
+        self._builder = builder
+        self._cond = threading.Condition()
+        self._idle = {}       # langs -> [(reader, size_mb), ...]
+        self._created = {}    # langs -> readers alive (idle + lent out)
+        self._size_mb = {}    # langs -> measured size of one reader
+        self._last_used = {}  # langs -> time of last release
+        self._held_mb = 0.0
+
+    def _estimate(self, langs):
+        """Expected size of a new reader for `langs`, or None before any reader was measured."""
+        if langs in self._size_mb:
+            return self._size_mb[langs]
+        # Unmeasured language lists are assumed to be as big as the biggest known reader
+        return max(self._size_mb.values(), default=None)
+
+    def _fits(self, langs):
+        if not self.max_mb or not any(self._created.values()):
+            # With nothing alive, one reader may always be built, or nobody could ever run
+            return True
+        estimate = self._estimate(langs)
+        if estimate is None:
+            # Sizes are unknown until the first build finishes; wait for it
+            return False
+        return self._held_mb + estimate <= self.max_mb
+
+    def _evict_idle(self, keep=None):
+        """Drop the least recently used idle reader (of another language list than `keep`)."""
+        candidates = [k for k, idle in self._idle.items() if idle and k != keep]
+        if not candidates:
+            return False
+        victim = min(candidates, key=lambda k: self._last_used.get(k, 0.0))
+        _, size_mb = self._idle[victim].pop()
+        self._created[victim] -= 1
+        self._held_mb -= size_mb
+        return True
+
+    def acquire(self, langs=("en",)):
+        langs = tuple(langs)
+        with self._cond:
+            while True:
+                idle = self._idle.get(langs)
+                if idle:
+                    return idle.pop()[0]
+                created = self._created.get(langs, 0)
+                if created < self.size:
+                    while not self._fits(langs) and self._evict_idle(langs):
+                        pass
+                    if self._fits(langs):
+                        # Reserve the slot and its estimated memory, build outside the lock
+                        reserved_mb = self._estimate(langs) or 0.0
+                        self._created[langs] = created + 1
+                        self._held_mb += reserved_mb
+                        break
+                self._cond.wait()
+
+        try:
+            reader = self._builder(langs)
+        except Exception:
+            with self._cond:
+                self._created[langs] -= 1
+                self._held_mb -= reserved_mb
+                self._cond.notify_all()
+            raise
+
+        size_mb = _reader_size_mb(reader)
+        with self._cond:
+            self._size_mb[langs] = size_mb
+            self._held_mb += size_mb - reserved_mb
+            self._cond.notify_all()
+        return reader
+
+    def release(self, reader, langs=("en",)):
+        langs = tuple(langs)
+        with self._cond:
+            self._idle.setdefault(langs, []).append((reader, self._size_mb.get(langs, 0.0)))
+            self._last_used[langs] = time.monotonic()
+            # A reader built on an estimate may have pushed the pool over the cap
+            while self.max_mb and self._held_mb > self.max_mb and self._evict_idle():
+                pass
+            self._cond.notify_all()
+
+    @contextmanager
+    def reader(self, langs=("en",)):
+        """Borrow a reader for `langs` for the duration of the block."""
+        reader = self.acquire(langs)
+        try:
+            yield reader
+        finally:
+            self.release(reader, langs)
+
+    def warm(self, langs=("en",)):
+        """Make sure at least one reader for `langs` is built and idle."""
+        with self.reader(langs):
+            pass
+        return self
+
+    def stats(self):
+        with self._cond:
+            return {
+                "readers": {"+".join(k): v for k, v in self._created.items() if v},
+                "idle": {"+".join(k): len(v) for k, v in self._idle.items() if v},
+                "held_mb": round(self._held_mb, 1),
+                "max_mb": self.max_mb,
+            }
+
+
+reader_pool = ReaderPool()
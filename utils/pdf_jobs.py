@@ -0,0 +1,117 @@
+# utils/pdf_jobs.py
+"""
+Background PDF report generation.
+
+submit_pdf_report() queues a report on a small, bounded worker pool and
+returns a job id straight away; the UI polls or waits on the job and shows
+the file when it is ready. Jobs are keyed by a hash of the report contents,
+so asking for the same report twice reuses the first job (and its file).
+The face image only goes to disk inside the job, for as long as rendering
+takes.
+"""
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+from utils.cache import image_fingerprint, make_key
+from utils.metrics import inc, span
+
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", "2"))
+PDF_JOBS_KEPT = 256  # finished jobs remembered for deduplication
+
+_executor = ThreadPoolExecutor(max_workers=PDF_WORKERS, thread_name_prefix="pdf")
+_jobs = OrderedDict()  # job id -> Future
+_running = set()
+_lock = threading.Lock()
+
+
+def _render(job_id, pdf_data, face_img):
+    from utils.pdf_report import generate_pdf_report
+
+    with _lock:
+        _running.add(job_id)
+    pdf_path = f"Mental_Health_Report_{job_id[:8]}.pdf"
+    temp_face_path = None
+    try:
+        print("🔄 Starting PDF generation process...")
+        if face_img:
+            temp_face_path = f"temp_face_{uuid.uuid4().hex}.jpg"
+            face_img.convert("RGB").save(temp_face_path)
+            print("✅ Face image added to PDF data")
+        else:
+            print("ℹ️ No face image available for PDF")
+
+        with span("pdf"):
+            success = generate_pdf_report(filename=pdf_path, face_image_path=temp_face_path, **pdf_data)
+
+        if success and os.path.exists(pdf_path):
+            print(f"✅ PDF successfully created: {pdf_path}, Size: {os.path.getsize(pdf_path)} bytes")
+            return pdf_path
+        print(f"❌ PDF creation failed: {pdf_path}")
+        inc("errors_total", stage="pdf")
+        return None
+    except Exception as e:
+        print(f"❌ PDF generation error: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        inc("errors_total", stage="pdf")
+        return None
+    finally:
+        # Clean up temporary files
+        if temp_face_path and os.path.exists(temp_face_path):
+            os.remove(temp_face_path)
+        with _lock:
+            _running.discard(job_id)
+
+
+def submit_pdf_report(pdf_data, face_img=None):
+    """Queue a PDF report and return its job id. Identical requests share one job."""
+    job_id = make_key(
+        "pdf",
+        json.dumps(pdf_data, sort_keys=True, default=str),
+        image_fingerprint(face_img) if face_img else b"",
+    )
+    with _lock:
+        future = _jobs.get(job_id)
+        reusable = future is not None and not (
+            future.done() and (future.result() is None or not os.path.exists(future.result()))
+        )
+        if reusable:
+            _jobs.move_to_end(job_id)
+            inc("pdf_jobs_deduplicated_total")
+            return job_id
+
+        _jobs[job_id] = _executor.submit(_render, job_id, pdf_data, face_img)
+        while len(_jobs) > PDF_JOBS_KEPT:
+            oldest_id, oldest = next(iter(_jobs.items()))
+            if not oldest.done():
+                break
+            del _jobs[oldest_id]
+    return job_id
+
+
+def pdf_job_status(job_id):
+    """'queued', 'running', 'done', 'failed' or 'unknown'."""
+    with _lock:
+        future = _jobs.get(job_id)
+        running = job_id in _running
+    if future is None:
+        return "unknown"
+    if not future.done():
+        return "running" if running else "queued"
+    return "done" if future.result() else "failed"
+
+
+def wait_for_pdf(job_id, timeout=None):
+    """Path of the finished report, or None if it failed, is unknown or is not ready within `timeout`."""
+    with _lock:
+        future = _jobs.get(job_id)
+    if future is None:
+        return None
+    try:
+        return future.result(timeout=timeout)
+    except FuturesTimeoutError:
+        return None
@@ -0,0 +1,98 @@
+# utils/prefork.py
+"""
+Prefork model workers.
+
+WorkerPool loads the models once in the parent, freezes the garbage
+collector's view of everything loaded so far (so collections in the children
+do not write to, and un-share, those pages), then forks the workers. The
+children see the parent's weights copy-on-write: N workers cost roughly one
+copy of DistilBERT, EasyOCR and the face model instead of N. Jobs go on the
+pool's shared queue, which hands each one to the next idle worker.
+
+Each worker gets `threads` intra-op torch threads (cpu_count // workers by
+default), so the workers together do not oversubscribe the cores.
+
+Metrics recorded in a worker stay in that process; callers that want them in
+the parent's /metrics return utils.metrics.drain_metrics() with the result
+and merge_metrics() it on arrival (app.py does this for every stage).
+
+The parent must not run inference before start(): an OpenMP thread pool
+started before fork() can hang the children. Where fork is unavailable
+(Windows, or macOS spawn defaults), workers are spawned and each loads its
+own models, as before.
+"""
+import gc
+import multiprocessing
+import os
+from concurrent.futures import Future
+
+from utils.metrics import drain_metrics, inc
+
+PREFORK_WORKERS = int(os.environ.get("PREFORK_WORKERS", "0"))
+
+
+def _init_worker(threads, models):
+    # A forked worker starts with a copy of the parent's metrics; only report what it records itself
+    drain_metrics()
+    if threads:
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+    if models:
+        # Spawned worker: nothing inherited, load our own copy
+        from utils.model_registry import warmup
+        warmup(models)
+
+
+class WorkerPool:
+    def __init__(self, workers=PREFORK_WORKERS, threads=None, models=None):
+        self.workers = max(1, workers)
+        self.threads = threads or max(1, (os.cpu_count() or 1) // self.workers)
+        self.models = models  # None = every registered model
+        self.forked = "fork" in multiprocessing.get_all_start_methods()
+        self._pool = None
+
+    def start(self):
+        """Load the models and start the workers. Returns self."""
+        from utils.model_registry import registered_models, warmup
+
+        models = list(self.models) if self.models is not None else registered_models()
+        if self.forked:
+            if models:
+                warmup(models)
+            gc.collect()
+            gc.freeze()
+            context, initargs = multiprocessing.get_context("fork"), (self.threads, None)
+        else:
+            print("⚠️ fork is not available here; each worker loads its own models")
+            context, initargs = multiprocessing.get_context("spawn"), (self.threads, models)
+        self._pool = context.Pool(self.workers, initializer=_init_worker, initargs=initargs)
+        return self
+
+    def submit(self, fn, *args):
+        """Run fn(*args) on the next idle worker. Returns a concurrent.futures.Future."""
+        future = Future()
+        inc("prefork_jobs_total")
+        self._pool.apply_async(fn, args, callback=future.set_result, error_callback=future.set_exception)
+        return future
+
+    def imap_unordered(self, fn, iterable):
+        return self._pool.imap_unordered(fn, iterable)
+
+    def close(self, terminate=False):
+        """Wait for queued jobs and stop the workers (or stop them at once with `terminate`)."""
+        if self._pool is not None:
+            if terminate:
+                self._pool.terminate()
+            else:
+                self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(terminate=exc_type is not None)
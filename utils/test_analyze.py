@@ -1,11 +1,21 @@
 # test_analyze.py
 import sys
 import os
+import tempfile
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PIL import Image, ImageDraw, ImageFont
 from utils.ocr import extract_text_pytesseract
 from utils.analyze_text import predict_mental_state
 
-image_path = r"C:\Users\ayush\Downloads\Sentences-with-Depression-Depression-in-a-Sentence-in-English-Sentences-for-Depression.webp"
+# Pass an image path to test on a real screenshot; otherwise a sample is rendered
+if len(sys.argv) > 1 and os.path.exists(sys.argv[1]):
+    image_path = sys.argv[1]
+else:
+    image_path = os.path.join(tempfile.gettempdir(), "test_analyze_sample.png")
+    image = Image.new("RGB", (900, 120), "white")
+    ImageDraw.Draw(image).text((30, 40), "I have been feeling depressed and alone lately.",
+                               fill="black", font=ImageFont.load_default(size=28))
+    image.save(image_path)
 
 # Step 1: Extract text
 text = extract_text_pytesseract(image_path)
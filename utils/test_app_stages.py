@@ -0,0 +1,65 @@
+# test_app_stages.py
+import sys
+import os
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+
+import app
+
+
+def _sentence(text):
+    return {"sentence": text, "detected_label": "Anxiety", "sentiment_label": "NEGATIVE",
+            "sentiment_score": 0.9, "scale": 7}
+
+
+@pytest.fixture
+def release():
+    event = threading.Event()
+    yield event
+    event.set()  # let the hung stage thread finish
+
+
+def test_slow_ocr_leaves_the_text_stage_its_own_budget(monkeypatch, release):
+    def hanging_ocr(text_img, timings=None):
+        release.wait(10)
+        return "late", "late text"
+
+    def slow_sentences(text, timings=None):
+        release.wait(0.2)  # would fail at once if OCR had used up the shared budget
+        return [_sentence(text)]
+
+    monkeypatch.setattr(app, "_ocr_stage", hanging_ocr)
+    monkeypatch.setattr(app, "_sentence_stage", slow_sentences)
+    monkeypatch.setitem(app.STAGE_TIMEOUTS, "ocr", 0.3)
+    monkeypatch.setitem(app.STAGE_TIMEOUTS, "text", 2)
+
+    summary, _ = app.analyze_user_input(None, "I am worried", text_img=b"image bytes")
+
+    assert summary["OCR Extracted Text"] == "⚠️ OCR failed: timed out after 0.3s"
+    assert "I am worried" in summary["Text Analysis"]
+    assert summary["Final Condition"] == "Anxiety"
+
+
+def test_a_crashing_face_stage_does_not_sink_the_text_result(monkeypatch):
+    def broken_face(face_img, rng, timings=None):
+        raise RuntimeError("detector exploded")
+
+    monkeypatch.setattr(app, "_face_stage", broken_face)
+    monkeypatch.setattr(app, "_sentence_stage", lambda text, timings=None: [_sentence(text)])
+
+    summary, _ = app.analyze_user_input(b"face bytes", "I am worried")
+
+    assert summary["Face Analysis"] == "⚠️ Face analysis error: detector exploded"
+    assert summary["Final Condition"] == "Anxiety"
+
+
+def test_a_hanging_face_stage_times_out(monkeypatch, release):
+    monkeypatch.setattr(app, "_face_stage", lambda face_img, rng, timings=None: release.wait(10))
+    monkeypatch.setattr(app, "_sentence_stage", lambda text, timings=None: [_sentence(text)])
+    monkeypatch.setitem(app.STAGE_TIMEOUTS, "face", 0.2)
+
+    summary, _ = app.analyze_user_input(b"face bytes", "I am worried")
+
+    assert summary["Face Analysis"] == "⚠️ Face analysis error: timed out after 0.2s"
+    assert summary["Final Condition"] == "Anxiety"
@@ -0,0 +1,33 @@
+# test_batch_analyze.py
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import batch_analyze
+import utils.analyze_text
+
+
+def _stub_classify(texts, *args, **kwargs):
+    return [{"label": "POSITIVE", "score": 0.9} for _ in texts]
+
+
+def test_resume_skips_done_ids_and_retries_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_analyze, "_init_worker", lambda *args: None)
+    monkeypatch.setattr(utils.analyze_text, "classify_texts", _stub_classify)
+
+    output = tmp_path / "results.jsonl"
+    output.write_text(
+        json.dumps({"id": "a", "label": "Anxiety"}) + "\n"
+        + json.dumps({"id": "b", "error": "out of memory"}) + "\n"
+        + '{"id": "c", "lab',  # half-written by a crash
+        encoding="utf-8",
+    )
+    entries = [("a", "I feel anxious"), ("b", "a calm walk in the park"), ("c", "so hopeless"), ("d", "fine day")]
+
+    stats = batch_analyze.run(entries, str(output), is_image=False, workers=0)
+
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert stats["processed"] == 3
+    assert [r["id"] for r in records] == ["a", "b", "b", "c", "d"]
+    assert all("error" not in r for r in records[2:])
+    assert batch_analyze.load_checkpoint(str(output)) == {"a", "b", "c", "d"}
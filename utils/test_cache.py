@@ -0,0 +1,47 @@
+# test_cache.py
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.cache import ResultCache, make_key, normalize_text, text_cache
+from utils.analyze_text import predict_mental_state_batch
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache("test", max_entries=2, disk_path=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expires_entries():
+    cache = ResultCache("test", ttl=0.01, disk_path=None)
+    cache.set("a", 1)
+    cache._entries["a"] = (0.0, 1)  # created long ago
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_tier_survives_a_new_process(tmp_path):
+    path = str(tmp_path / "cache.db")
+    ResultCache("test", disk_path=path).set("k", ("Anxiety", 0.95))
+    fresh = ResultCache("test", disk_path=path)
+    assert fresh.get("k") == ("Anxiety", 0.95)
+    assert fresh.stats()["disk_hits"] == 1
+
+
+def test_keys_ignore_case_and_spacing_only():
+    assert make_key(normalize_text("I feel  SAD\n")) == make_key(normalize_text("i feel sad"))
+    assert make_key("ab", "c") != make_key("a", "bc")
+
+
+def test_batch_results_are_cached():
+    text_cache.clear()
+    before = text_cache.stats()["hits"]
+    first = predict_mental_state_batch(["So lonely tonight", "Feeling great"])
+    second = predict_mental_state_batch(["so lonely   tonight", "Feeling great"])
+    assert first == second
+    assert text_cache.stats()["hits"] - before == 2
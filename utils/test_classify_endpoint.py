@@ -0,0 +1,54 @@
+# test_classify_endpoint.py
+import sys
+import os
+import json
+import urllib.error
+import urllib.request
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+
+import utils.analyze_text as analyze_text
+from utils.cache import text_cache
+
+
+def _stub_classify(texts, *args, **kwargs):
+    return [{"label": "NEGATIVE" if "rain" in text else "POSITIVE", "score": 0.8} for text in texts]
+
+
+def _post(url, payload):
+    request = urllib.request.Request(url, data=payload, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.status, json.loads(response.read())
+
+
+def test_classify_endpoint_round_trip(monkeypatch):
+    monkeypatch.setattr(analyze_text, "classify_texts", _stub_classify)
+    text_cache.clear()
+    server = analyze_text.start_classify_server(port=0)
+    url = f"http://{server.server_address[0]}:{server.server_address[1]}/classify"
+
+    texts = ["The rain kept falling on the roof", "I feel anxious today", "We walked by the river"]
+    status, body = _post(url, json.dumps({"texts": texts}).encode())
+
+    assert status == 200
+    assert [(r["text"], r["label"]) for r in body["results"]] == [
+        (texts[0], "Depression/Stress"), (texts[1], "Anxiety"), (texts[2], "Positive/Neutral"),
+    ]
+    assert body["results"][0]["score"] == 0.8
+
+    with pytest.raises(urllib.error.HTTPError) as error:
+        _post(url, json.dumps({"texts": "not a list"}).encode())
+    assert error.value.code == 400
+
+
+def test_micro_batching_keeps_the_callers_batch_size(monkeypatch):
+    sizes = []
+
+    def classify(texts, batch_size=analyze_text.DEFAULT_BATCH_SIZE, **kwargs):
+        sizes.append(batch_size)
+        return _stub_classify(texts)
+
+    monkeypatch.setattr(analyze_text, "classify_texts", classify)
+    monkeypatch.setattr(analyze_text, "MICROBATCH_ENABLED", True)
+    assert analyze_text._classify(["a", "b"], batch_size=4) == _stub_classify(["a", "b"])
+    assert sizes == [4]
@@ -0,0 +1,93 @@
+# test_classify_texts.py
+import sys
+import os
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+import torch
+from tokenizers import Tokenizer, models, pre_tokenizers, processors
+from transformers import PreTrainedTokenizerFast
+
+from utils.analyze_text import classify_texts
+
+MAX_LENGTH = 16  # 14 content tokens per window
+VOCAB = {"[PAD]": 0, "[UNK]": 1, "[CLS]": 2, "[SEP]": 3, "bad": 4, "good": 5}
+VOCAB.update({f"w{i}": 6 + i for i in range(64)})
+
+
+def _tokenizer():
+    tokenizer = Tokenizer(models.WordLevel(VOCAB, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]", special_tokens=[("[CLS]", 2), ("[SEP]", 3)]
+    )
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer, model_max_length=MAX_LENGTH,
+        pad_token="[PAD]", unk_token="[UNK]", cls_token="[CLS]", sep_token="[SEP]",
+    )
+
+
+class _CountingModel:
+    """P(NEGATIVE), P(POSITIVE) = the window's share of "bad" and "good" tokens."""
+
+    config = SimpleNamespace(max_position_embeddings=MAX_LENGTH, num_labels=2,
+                             id2label={0: "NEGATIVE", 1: "POSITIVE"})
+
+    def __init__(self):
+        self.windows = []  # input ids of every window seen, in call order
+        self.batches = []  # padded length of each batch
+
+    def __call__(self, input_ids, attention_mask):
+        self.batches.append(input_ids.shape[1])
+        logits = []
+        for ids, mask in zip(input_ids.tolist(), attention_mask.tolist()):
+            ids = [t for t, m in zip(ids, mask) if m]
+            self.windows.append(ids)
+            counts = torch.tensor([ids.count(VOCAB["bad"]), ids.count(VOCAB["good"])], dtype=torch.float)
+            logits.append(torch.log(counts + 1e-6))
+        return SimpleNamespace(logits=torch.stack(logits))
+
+
+@pytest.fixture
+def classifier():
+    return SimpleNamespace(tokenizer=_tokenizer(), model=_CountingModel())
+
+
+def _words(n, start=0):
+    return " ".join(f"w{i}" for i in range(start, start + n))
+
+
+def test_long_texts_are_split_into_overlapping_windows(classifier):
+    classify_texts([_words(34)], overlap=4, classifier=classifier)
+    windows = [ids[1:-1] for ids in classifier.model.windows]  # drop [CLS] / [SEP]
+
+    assert len(windows) == 3
+    assert [len(w) for w in windows] == [14, 14, 14]
+    for left, right in zip(windows, windows[1:]):
+        assert left[-4:] == right[:4]
+    assert sorted({t for w in windows for t in w}) == [VOCAB[f"w{i}"] for i in range(34)]
+
+
+def test_every_text_gets_a_result_in_input_order(classifier):
+    texts = ["good " * 30, "bad", "", "good good bad", "bad " * 20 + "good"]
+    results = classify_texts(iter(texts), batch_size=2, overlap=4, classifier=classifier)
+
+    assert len(results) == len(texts)
+    assert [r["label"] for r in results] == ["POSITIVE", "NEGATIVE", "NEGATIVE", "POSITIVE", "NEGATIVE"]
+    assert results[0]["score"] == pytest.approx(1.0)
+    # Windows were sent shortest first, so each batch pads to its own longest window
+    assert classifier.model.batches == sorted(classifier.model.batches)
+
+
+def test_windows_can_be_weighted_by_length(classifier):
+    # 14-token window mostly bad, then a 2-token window that is all good
+    text = " ".join(["bad"] * 10 + ["good"] * 4 + ["good"] * 2)
+    assert classify_texts([text], overlap=0, classifier=classifier)[0]["label"] == "POSITIVE"
+    weighted = classify_texts([text], overlap=0, weight_by_length=True, classifier=classifier)[0]
+    assert weighted == {"label": "NEGATIVE", "score": pytest.approx(10 / 16)}
+
+
+def test_empty_input_returns_nothing(classifier):
+    assert classify_texts([], classifier=classifier) == []
+    assert classify_texts(iter([]), classifier=classifier) == []
+    assert classifier.model.batches == []
@@ -0,0 +1,79 @@
+# test_face_engine.py
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pytest
+from PIL import Image
+
+import utils.face_engine as face_engine_module
+from utils.face_engine import FaceEngine, analyze_face, analyze_faces, analyze_group
+
+
+class _StubDetector:
+    def __init__(self, boxes):
+        self.boxes = boxes
+        self.shapes = []
+
+    def detectMultiScale(self, gray, **kwargs):
+        self.shapes.append(gray.shape)
+        return self.boxes
+
+
+def _stub_classifier(crops, top_k=None, batch_size=None):
+    # Wide crops look happy, the rest sad, so each result shows which crop it came from
+    return [
+        [{"label": "happy" if crop.width > crop.height else "sad", "score": 0.9},
+         {"label": "neutral", "score": 0.1}]
+        for crop in crops
+    ]
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    def install(boxes, max_side=100):
+        detector = _StubDetector(boxes)
+        engine = FaceEngine(max_side=max_side, detector_builder=lambda: detector)
+        monkeypatch.setattr(face_engine_module, "face_engine", engine)
+        monkeypatch.setattr(face_engine_module, "get_model", lambda name: _stub_classifier)
+        return engine, detector
+    return install
+
+
+def test_boxes_are_scaled_back_with_margins(engine):
+    face_engine, detector = engine([(10, 20, 30, 30)], max_side=100)
+    image = Image.new("RGB", (400, 200))
+
+    assert face_engine.detect(image) == [(16, 56, 184, 200)]  # bottom clipped to the image
+    assert detector.shapes == [(50, 100)]  # detection ran on the small grayscale copy
+
+
+def test_margins_are_clipped_to_the_image(engine):
+    face_engine, _ = engine([(0, 0, 50, 50)], max_side=100)
+    assert face_engine.detect(Image.new("RGB", (100, 100))) == [(0, 0, 60, 60)]
+
+
+def test_no_face_classifies_the_whole_image(engine):
+    face_engine, _ = engine([])
+    image = Image.new("RGB", (120, 60))
+    assert face_engine.crops(image)[0].size == (120, 60)
+    assert analyze_face(image)[0] == "Positive / Healthy (happy)"
+
+
+def test_missing_detector_classifies_the_whole_image(monkeypatch):
+    def broken():
+        raise ImportError("no cv2")
+
+    engine = FaceEngine(detector_builder=broken)
+    assert engine.detect(Image.new("RGB", (50, 50))) == []
+    assert engine.crops(np.zeros((30, 40, 3), dtype=np.uint8))[0].size == (40, 30)
+
+
+def test_every_face_is_classified_largest_first(engine):
+    # A small wide face and a large tall one
+    engine([(10, 10, 20, 10), (50, 10, 30, 60)], max_side=200)
+    image = Image.new("RGB", (200, 100))
+
+    results = analyze_group(image)
+    assert [status for status, _, _ in results] == ["Depression/Stress (sad)", "Positive / Healthy (happy)"]
+    assert analyze_faces([image, image]) == [results[0], results[0]]
@@ -1,5 +1,11 @@
 # test_health_tips.py
-from health_tips import get_health_tips
+import sys
+import os
+import json
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import health_tips
+from utils.health_tips import get_health_tips
 
 # List of example mental states
 states = ["Depression/Stress", "Anxiety", "Positive/Neutral", "Unknown"]
@@ -9,3 +15,28 @@ for state in states:
     tips = get_health_tips(state)
     for tip in tips:
         print("-", tip)
+
+
+def _write_catalog(path, tip):
+    path.write_text(json.dumps({"default_tips": ["Rest."], "conditions": {"Anxiety": {"tips": [tip]}}}))
+
+
+def test_catalog_reloads_when_the_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "wellness.json"
+    _write_catalog(path, "Breathe slowly.")
+    monkeypatch.setattr(health_tips, "WELLNESS_PATH", str(path))
+    monkeypatch.setattr(health_tips, "WELLNESS_RELOAD_SECONDS", 0.001)
+    monkeypatch.setattr(health_tips, "_catalog", None)
+    assert get_health_tips("Anxiety") == ["Breathe slowly."]
+
+    _write_catalog(path, "Take a short walk.")
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    time.sleep(0.01)
+    assert get_health_tips("Anxiety") == ["Take a short walk."]
+
+    # A broken edit keeps the last good catalog
+    path.write_text("{not json")
+    os.utime(path, (stat.st_atime, stat.st_mtime + 20))
+    time.sleep(0.01)
+    assert get_health_tips("Anxiety") == ["Take a short walk."]
@@ -0,0 +1,59 @@
+# test_history.py
+import sys
+import os
+import random
+import time
+from datetime import date, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.history import HistoryStore, history_key
+
+
+def _rescan(entries, today, window):
+    recent = [e for e in entries if 0 <= (today - e[0]).days < window]
+    counts = {}
+    for _, condition, _ in recent:
+        counts[condition] = counts.get(condition, 0) + 1
+    return len(recent), counts
+
+
+def test_rolling_windows_match_a_full_rescan(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite3"))
+    rng = random.Random(0)
+    entries = []
+    for _ in range(120):
+        days_ago = rng.randrange(45)
+        condition = rng.choice(["Anxiety", "Neutral", "Depression/Stress"])
+        scale = rng.randint(1, 10)
+        store.record("u1", condition, {condition: 1}, scale, 0.7, created=time.time() - days_ago * 86400)
+        entries.append((date.today() - timedelta(days=days_ago), condition, scale))
+
+    for shift in (0, 3, 12, 40):
+        today = date.today() + timedelta(days=shift)
+        trend = store.trend("u1", today=today)
+        for window in (7, 30):
+            n, counts = _rescan(entries, today, window)
+            assert trend[window]["entries"] == n
+            assert {k: round(v * n) for k, v in trend[window]["distribution"].items()} == counts
+
+
+def test_users_are_kept_apart(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite3"))
+    store.record("a", "Anxiety", {"Anxiety": 2}, 8, 0.8)
+    assert store.trend("b")[7]["entries"] == 0
+    assert store.trend("a")[7]["avg_scale"] == 8
+    assert [n for _, n, _ in store.daily_series("a")] == [1]
+
+
+def test_same_input_counts_once_per_day(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite3"))
+    assert store.record("u1", "Anxiety", {"Anxiety": 1}, 6, 0.8, seed="s1")
+    assert not store.record("u1", "Anxiety", {"Anxiety": 1}, 6, 0.8, seed="s1")
+    assert store.record("u2", "Anxiety", {"Anxiety": 1}, 6, 0.8, seed="s1")
+    assert store.record("u1", "Anxiety", {"Anxiety": 1}, 6, 0.8, seed="s1", created=time.time() - 86400)
+    assert store.trend("u1")[7]["entries"] == 2
+    assert store.daily_series("u1")[-1][1] == 1
+
+
+def test_short_history_keys_are_refused():
+    assert history_key("alice") is None
+    assert history_key("a long private passphrase", secret="s") != history_key("a long private passphrase", secret="t")
@@ -0,0 +1,54 @@
+# test_lexicon.py
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.lexicon import Lexicon, get_lexicon
+from utils.analyze_text import predict_mental_state, predict_mental_state_batch
+
+
+def test_matches_whole_words_only():
+    lexicon = get_lexicon()
+    assert lexicon.best_label(lexicon.scores("I said goodbye at the embassy")) is None
+    assert lexicon.best_label(lexicon.scores("Such sadness today")) == "Depression/Stress"
+
+
+def test_weights_break_ties_within_a_tier():
+    lexicon = Lexicon({"A": {"calm": 1.0}, "B": {"panic": 1.5, "panic attack": 3.0}}, [["A", "B"]])
+    scores = lexicon.scores("Calm morning, then a panic attack")
+    assert scores == {"A": 1.0, "B": 3.0}
+    assert lexicon.best_label(scores) == "B"
+
+
+def test_higher_tiers_win_over_heavier_lower_tiers():
+    lexicon = Lexicon({"A": {"calm": 1.0}, "B": {"panic": 1.5}}, ["B", "A"])
+    assert lexicon.best_label(lexicon.scores("calm, calm, calm, then panic")) == "B"
+
+
+def test_mixed_signals_keep_the_negative_label():
+    lexicon = get_lexicon()
+    assert lexicon.best_label(lexicon.scores("I feel happy and excited but so anxious")) == "Anxiety"
+    assert lexicon.best_label(lexicon.scores(
+        "Good day at work but I am worried and scared about tomorrow, great dinner though"
+    )) == "Anxiety"
+    assert lexicon.best_label(lexicon.scores("Great, good, happy and joyful, yet lonely")) == "Depression/Stress"
+    assert lexicon.best_label(lexicon.scores("sad and stressed but a bit nervous")) == "Anxiety"
+    assert predict_mental_state("I feel happy and excited but so anxious") == ("Anxiety", 0.95)
+
+
+def test_ties_follow_priority_order():
+    lexicon = get_lexicon()
+    assert lexicon.best_label(lexicon.scores("happy but worried")) == "Anxiety"
+
+
+def test_batch_scores_match_single_scores():
+    lexicon = get_lexicon()
+    texts = ["I feel sad", "", "good day, great mood", "nervous\nand lonely", "İstanbul was happy"]
+    assert lexicon.scores_batch(texts) == [lexicon.scores(t) for t in texts]
+
+
+def test_keyword_hits_skip_the_model():
+    texts = ["Feeling anxious", "So much stress", "Excited for tomorrow"]
+    assert predict_mental_state_batch(texts) == [predict_mental_state(t) for t in texts]
+    assert [label for label, _ in predict_mental_state_batch(texts)] == [
+        "Anxiety", "Depression/Stress", "Positive/Neutral"
+    ]
@@ -0,0 +1,29 @@
+# test_metrics.py
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils.metrics as metrics
+from utils.prefork import WorkerPool
+
+
+def _worker_job():
+    metrics.inc("worker_jobs_total", stage="ocr")
+    metrics.observe("ocr", 0.02)
+    return "done", metrics.drain_metrics()
+
+
+def test_worker_metrics_reach_the_parent(monkeypatch):
+    monkeypatch.setattr(metrics, "TRACING_ENABLED", True)
+    monkeypatch.setattr(metrics, "_counters", {})
+    monkeypatch.setattr(metrics, "_spans", {})
+    metrics.observe("ocr", 0.5)  # recorded before the fork; must not be counted twice
+
+    with WorkerPool(workers=1, models=[]) as pool:
+        for _ in range(2):
+            result, worker_metrics = pool.submit(_worker_job).result(timeout=30)
+            metrics.merge_metrics(worker_metrics)
+
+    assert result == "done"
+    assert metrics._counters[("worker_jobs_total", (("stage", "ocr"),))] == 2
+    assert metrics._spans["ocr"][len(metrics.SPAN_BUCKETS)] == 3
+    assert 'analyzer_stage_seconds_count{stage="ocr"} 3' in metrics.render_prometheus()
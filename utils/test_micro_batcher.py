@@ -0,0 +1,52 @@
+# test_micro_batcher.py
+import sys
+import os
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+from utils.micro_batcher import MicroBatcher
+
+
+def test_concurrent_callers_share_batches():
+    sizes = []
+    batcher = MicroBatcher(lambda items: sizes.append(len(items)) or [i * 2 for i in items],
+                           max_batch_size=8, max_wait_ms=50)
+    results = {}
+
+    def call(i):
+        results[i] = batcher.predict([i])[0]
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {i: i * 2 for i in range(16)}
+    assert max(sizes) <= 8
+    assert len(sizes) < 16
+
+
+def test_errors_reach_every_caller_in_the_batch():
+    def fail(items):
+        raise ValueError("model down")
+
+    batcher = MicroBatcher(fail, max_batch_size=4, max_wait_ms=1)
+    with pytest.raises(ValueError):
+        batcher.predict(["a", "b"])
+
+
+def test_short_results_fail_the_whole_batch_instead_of_hanging():
+    batcher = MicroBatcher(lambda items: items[:-1], max_batch_size=4, max_wait_ms=20)
+    with pytest.raises(ValueError, match="returned 2 results"):
+        batcher.predict(["a", "b", "c"], timeout=5)
+
+
+def test_predict_gives_up_after_its_timeout():
+    release = threading.Event()
+    batcher = MicroBatcher(lambda items: release.wait(5) and items, max_batch_size=1, max_wait_ms=1)
+    try:
+        with pytest.raises(TimeoutError):
+            batcher.predict(["a"], timeout=0.1)
+    finally:
+        release.set()
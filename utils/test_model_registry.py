@@ -0,0 +1,52 @@
+# test_model_registry.py
+import sys
+import os
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+import torch
+import transformers
+import transformers.pipelines
+
+from utils.model_registry import SENTIMENT_MODEL, build_sentiment
+
+
+@pytest.fixture
+def pipeline_calls(monkeypatch):
+    calls = []
+
+    def fake_pipeline(task, model=None, framework=None):
+        calls.append((task, model, framework))
+        return SimpleNamespace(model=torch.nn.Sequential(torch.nn.Linear(4, 2)))
+
+    # `from transformers import pipeline` can resolve through either name
+    monkeypatch.setattr(transformers, "pipeline", fake_pipeline)
+    monkeypatch.setattr(transformers.pipelines, "pipeline", fake_pipeline)
+    return calls
+
+
+def test_unknown_backend_is_rejected(pipeline_calls):
+    with pytest.raises(ValueError, match="Unknown sentiment backend 'tf'"):
+        build_sentiment(backend="tf")
+    assert pipeline_calls == []
+
+
+def test_pt_backend_keeps_the_float_model(pipeline_calls):
+    classifier = build_sentiment(backend="pt")
+    assert pipeline_calls == [("text-classification", SENTIMENT_MODEL, "pt")]
+    assert type(classifier.model[0]) is torch.nn.Linear
+
+
+def test_pt_int8_backend_quantizes_linear_layers(pipeline_calls):
+    classifier = build_sentiment(backend="pt-int8")
+    layer = classifier.model[0]
+    assert type(layer) is not torch.nn.Linear
+    assert layer.weight().dtype == torch.qint8
+    assert classifier.model(torch.ones(1, 4)).shape == (1, 2)
+
+
+def test_threads_are_applied_to_torch(pipeline_calls, monkeypatch):
+    threads = []
+    monkeypatch.setattr(torch, "set_num_threads", threads.append)
+    build_sentiment(backend="pt", threads=3)
+    assert threads == [3]
@@ -0,0 +1,71 @@
+# test_ocr.py
+import sys
+import os
+from contextlib import contextmanager
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+from PIL import Image
+
+import utils.ocr as ocr
+from utils.cache import ocr_cache
+
+
+class _FakeEasyOCR:
+    def __init__(self):
+        self.calls = 0
+
+    @contextmanager
+    def reader(self, langs):
+        yield self
+
+    def readtext(self, image, detail=0):
+        self.calls += 1
+        return ["from", "easyocr"]
+
+
+def _tesseract_data(words, confs):
+    n = len(words)
+    return {"text": words, "conf": confs, "block_num": [1] * n, "par_num": [1] * n, "line_num": [1] * n}
+
+
+@pytest.fixture
+def easyocr(monkeypatch):
+    ocr_cache.clear()
+    fake = _FakeEasyOCR()
+    monkeypatch.setattr(ocr, "get_model", lambda name: fake)
+    monkeypatch.setattr(ocr, "_tesserocr_api", lambda lang: None)
+    yield fake
+    ocr_cache.clear()
+
+
+def _image(color="white"):
+    return Image.new("RGB", (64, 32), color)
+
+
+def _stub_tesseract(monkeypatch, fn):
+    monkeypatch.setattr(ocr.pytesseract, "image_to_data", fn)
+
+
+def test_confident_tesseract_is_kept(monkeypatch, easyocr):
+    _stub_tesseract(monkeypatch, lambda *a, **k: _tesseract_data(["I", "feel", "fine"], [95, 90, 92]))
+    assert ocr.extract_text(_image()) == ("I feel fine", "tesseract")
+    assert easyocr.calls == 0
+
+
+def test_low_confidence_falls_back_to_easyocr(monkeypatch, easyocr):
+    _stub_tesseract(monkeypatch, lambda *a, **k: _tesseract_data(["I", "fe3l"], [40, 30]))
+    assert ocr.extract_text(_image(), min_confidence=70) == ("from easyocr", "easyocr")
+    assert easyocr.calls == 1
+
+
+def test_empty_tesseract_output_falls_back(monkeypatch, easyocr):
+    _stub_tesseract(monkeypatch, lambda *a, **k: _tesseract_data(["", " "], [-1, -1]))
+    assert ocr.extract_text(_image("black"), min_confidence=0) == ("from easyocr", "easyocr")
+
+
+def test_tesseract_error_falls_back(monkeypatch, easyocr):
+    def broken(*args, **kwargs):
+        raise RuntimeError("tesseract is not installed")
+
+    _stub_tesseract(monkeypatch, broken)
+    assert ocr.extract_text(_image("gray")) == ("from easyocr", "easyocr")
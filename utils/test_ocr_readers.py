@@ -0,0 +1,82 @@
+# test_ocr_readers.py
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.ocr_readers import ReaderPool
+
+MB = 1024 * 1024
+
+
+class _Params:
+    def numel(self):
+        return 100 * MB
+
+    def element_size(self):
+        return 1
+
+
+class _FakeNet:
+    def parameters(self):
+        return [_Params()]
+
+
+class _FakeReader:
+    def __init__(self, langs):
+        self.langs = langs
+        self.detector = _FakeNet()  # 100 MB per reader
+
+
+def _slow_builder(langs):
+    time.sleep(0.05)
+    return _FakeReader(langs)
+
+
+def test_memory_cap_holds_under_concurrent_borrows():
+    pool = ReaderPool(size=2, max_mb=250, builder=_slow_builder)
+    peak = []
+    done = threading.Event()
+
+    def watch():
+        while not done.is_set():
+            peak.append(pool.stats()["held_mb"])
+            time.sleep(0.005)
+
+    def borrow(langs):
+        with pool.reader(langs):
+            time.sleep(0.1)
+
+    watcher = threading.Thread(target=watch)
+    watcher.start()
+    pool.warm(["en"])  # first reader measured, so later ones are estimated
+    threads = [threading.Thread(target=borrow, args=(langs,)) for langs in (["en"], ["en"], ["hi"], ["ta"])]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    done.set()
+    watcher.join()
+
+    assert max(peak) <= 250
+    assert pool.stats()["held_mb"] <= 250
+
+
+def test_cold_pool_builds_one_reader_before_estimating():
+    pool = ReaderPool(size=2, max_mb=150, builder=_slow_builder)
+    threads = [threading.Thread(target=pool.warm, args=(langs,)) for langs in (["en"], ["hi"], ["ta"])]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert pool.stats()["held_mb"] <= 150
+
+
+def test_release_trims_back_under_the_cap():
+    pool = ReaderPool(size=2, max_mb=150, builder=_slow_builder)
+    reader = pool.acquire(["en"])
+    pool.release(reader, ["en"])
+    pool.max_mb = 50  # cap lowered below what is held
+    reader = pool.acquire(["en"])
+    pool.release(reader, ["en"])
+    assert pool.stats()["held_mb"] == 0
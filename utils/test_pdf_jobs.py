@@ -0,0 +1,30 @@
+# test_pdf_jobs.py
+import sys
+import os
+import types
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.pdf_jobs import pdf_job_status, submit_pdf_report, wait_for_pdf
+
+
+def test_identical_reports_share_one_job(tmp_path, monkeypatch):
+    renders = []
+
+    def generate_pdf_report(filename, face_image_path=None, **pdf_data):
+        renders.append(pdf_data)
+        with open(filename, "w") as f:
+            f.write("%PDF")
+        return True
+
+    monkeypatch.setitem(sys.modules, "utils.pdf_report",
+                        types.SimpleNamespace(generate_pdf_report=generate_pdf_report))
+    monkeypatch.chdir(tmp_path)
+
+    pdf_data = {"condition": "Anxiety", "tips": ["Breathe slowly."], "accuracy": 0.7}
+    first = submit_pdf_report(pdf_data)
+    second = submit_pdf_report(dict(pdf_data))
+
+    assert first == second
+    assert wait_for_pdf(first, timeout=10)
+    assert pdf_job_status(first) == "done"
+    assert submit_pdf_report(pdf_data) == first
+    assert len(renders) == 1